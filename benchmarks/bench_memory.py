@@ -0,0 +1,77 @@
+# Memory benchmark for the per ap/ssid pair results MerakiBssidGetter keeps in memory.
+#
+# Builds the same pairs as Bssid objects and as the dict based objects Bssid used to be,
+# and reports the memory traced for each:
+#   python benchmarks/bench_memory.py [pairs]
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_getter import Bssid
+
+
+class DictBssid:
+    def __init__(self,ssid,ap,bssids):
+        self.ssid = ssid
+        self.ap = ap
+        self.bssids = bssids
+
+
+# Pairs are grouped the way the getter sees them: networks of 10 aps with 15 ssids each.
+# Ssid names come out of each network's json and macs out of the inventory, so each network
+# has its own copies of the names and each ap one copy of its mac.
+def sample_pairs(pairs):
+    ap_models = sorted(MerakiBssidCalculator.ap_families)
+    network_aps = 10
+    ssid_names = []
+    for i in range(pairs):
+        ap = i // 15
+        ssid_number = i % 15
+        if (i % (network_aps * 15) == 0):
+            ssid_names = [''.join(['SSID ',str(number)]) for number in range(15)]
+        if (ssid_number == 0):
+            ap_model = ap_models[ap % len(ap_models)]
+            oui = sorted(MerakiBssidCalculator.ap_offset(ap_model))[0]
+            ap_mac = oui + ':' + MerakiBssidCalculator.format_mac(ap)[9:]
+        yield (ssid_names[ssid_number],ap_model,ap_mac,ssid_number)
+
+
+def measure(build,pairs):
+    tracemalloc.start()
+    results = build(pairs)
+    current,peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return current
+
+
+def build_dict_bssids(pairs):
+    return [
+        DictBssid(ssid,ap_mac,MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number+1))
+        for ssid,ap_model,ap_mac,ssid_number in sample_pairs(pairs)
+    ]
+
+
+def build_bssids(pairs):
+    return [
+        Bssid(ssid,ap_mac,MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number+1),ssid_number)
+        for ssid,ap_model,ap_mac,ssid_number in sample_pairs(pairs)
+    ]
+
+
+def main():
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    dict_bytes = measure(build_dict_bssids,pairs)
+    bssid_bytes = measure(build_bssids,pairs)
+    print('pairs: ' + str(pairs))
+    print('dict based Bssid: %.1f MB (%d bytes per pair)' % (dict_bytes / 1e6,dict_bytes // pairs))
+    print('slotted Bssid:    %.1f MB (%d bytes per pair)' % (bssid_bytes / 1e6,bssid_bytes // pairs))
+    print('reduction:        %.1fx' % (dict_bytes / float(bssid_bytes)))
+
+
+if __name__ == '__main__':
+    main()
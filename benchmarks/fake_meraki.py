@@ -0,0 +1,102 @@
+# A synthetic dashboard for benchmarking MerakiBssidGetter without a dashboard account.
+#
+# FakeOrg generates an org of a configurable size and answers the dashboard calls the getter
+# makes, optionally sleeping for `latency` seconds per call to stand in for the network:
+#   org = FakeOrg(networks=500,aps_per_network=20,templates=5,ssids_per_network=4,latency=0.05)
+#
+# install(org) replaces the meraki lib with a module that serves the fake org, so the
+# getter's default (serial) path runs against it.  The getter imports the meraki lib on its
+# first dashboard call, so install has to run before that.  For the concurrent path, hand the org to the getter as its dashboard client:
+#   install(org)
+#   from meraki_bssid_getter import MerakiBssidGetter
+#   getter = MerakiBssidGetter('fake-key')
+#   getter.dashboard = org
+#
+# org.calls counts the calls made to each endpoint.
+
+from collections import Counter
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+
+
+class FakeOrg:
+    def __init__(self,networks=100,aps_per_network=10,templates=0,ssids_per_network=4,switches_per_network=1,latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.networks = []
+        self.inventory = []
+        self.ssids = {}
+        ap_models = sorted(MerakiBssidCalculator.ap_families)
+        for template in range(templates):
+            self.ssids['L_' + str(template)] = self.__ssids('Template ' + str(template),ssids_per_network)
+        device = 0
+        for network in range(networks):
+            network_id = 'N_' + str(network)
+            entry = {'id': network_id, 'organizationId': '1', 'name': 'Network ' + str(network)}
+            # every other network is bound to a template when there are any
+            if (templates > 0) and (network % 2 == 0):
+                entry['configTemplateId'] = 'L_' + str((network // 2) % templates)
+            self.networks.append(entry)
+            self.ssids[network_id] = self.__ssids(entry['name'],ssids_per_network)
+            for ap in range(aps_per_network):
+                ap_model = ap_models[device % len(ap_models)]
+                oui = sorted(MerakiBssidCalculator.ap_offset(ap_model))[device % len(MerakiBssidCalculator.ap_offset(ap_model))]
+                self.inventory.append(self.__device(ap_model,oui,device,network_id))
+                device += 1
+            for switch in range(switches_per_network):
+                self.inventory.append(self.__device('MS220-8P','e0:55:3d',device,network_id))
+                device += 1
+
+    def getnetworklist(self,org_id):
+        self.__call('getnetworklist')
+        return [dict(network) for network in self.networks]
+
+    def getorginventory(self,org_id):
+        self.__call('getorginventory')
+        return [dict(device) for device in self.inventory]
+
+    def getssids(self,network_id):
+        self.__call('getssids')
+        return [dict(ssid) for ssid in self.ssids[network_id]]
+
+    def __call(self,endpoint):
+        with self.lock:
+            self.calls[endpoint] += 1
+        if (self.latency > 0):
+            time.sleep(self.latency)
+
+    def __ssids(self,name,enabled):
+        return [
+            {'number': number, 'name': name + ' SSID ' + str(number + 1), 'enabled': number < enabled}
+            for number in range(15)
+        ]
+
+    def __device(self,model,oui,device,network_id):
+        return {
+            'mac': oui + ':' + MerakiBssidCalculator.format_mac(device)[9:],
+            'serial': 'Q2XX-' + str(device),
+            'networkId': network_id,
+            'model': model,
+            'claimedAt': 0,
+            'publicIp': None
+        }
+
+
+def install(org):
+    lib = types.ModuleType('meraki.meraki')
+    lib.getnetworklist = lambda api_key,org_id,suppressprint=False: org.getnetworklist(org_id)
+    lib.getorginventory = lambda api_key,org_id,suppressprint=False: org.getorginventory(org_id)
+    lib.getssids = lambda api_key,network_id,suppressprint=False: org.getssids(network_id)
+    package = types.ModuleType('meraki')
+    package.meraki = lib
+    sys.modules['meraki'] = package
+    sys.modules['meraki.meraki'] = lib
+    return lib
@@ -0,0 +1,286 @@
+# Benchmark suite for the calculator and the getter.
+#
+# Runs against a synthetic org (see fake_meraki), so no dashboard access is needed:
+#   python benchmarks/run_benchmarks.py -o results.json
+#   python benchmarks/run_benchmarks.py --networks 2000 --aps-per-network 20 --templates 10 --latency 0.05 --workers 8
+#
+# Benchmarks:
+#   import         cold import time of the calculator, getter and cli, each timed inside a
+#                  fresh interpreter.  Also records whether the
+#                  import pulled in numpy, requests or the meraki lib, which it shouldn't.
+#                  With --import-budget (milliseconds) the run exits 1 if any import goes over
+#                  it or loads one of those, so it can gate a ci job
+#   calculate      MerakiBssidCalculator.calculate for one model per ap family and oui
+#   batch          calculate_many against a calculate loop, with and without numpy
+#   index          BssidIndex build and lookup
+#   memory         bytes held per Bssid result (see bench_memory)
+#   getter         end to end get_org_bssids and export_org_bssids_to_csv, serially and with
+#                  --workers threads
+#
+# Results are written as json: one entry per benchmark with its parameters, the best time
+# out of --repeat runs and a per operation rate, plus enough metadata (python, numpy,
+# git commit) to compare runs over time.
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+import fake_meraki
+
+
+def best_time(function,repeat,number=1):
+    return min(timeit.Timer(function).repeat(repeat=repeat,number=number)) / number
+
+
+def result(name,params,seconds,operations):
+    return {
+        'name': name,
+        'params': params,
+        'seconds': seconds,
+        'operations': operations,
+        'operations_per_second': operations / seconds if seconds > 0 else None
+    }
+
+
+def sample_macs(count):
+    from meraki_bssid_calculator import MerakiBssidCalculator
+    ap_models = sorted(MerakiBssidCalculator.ap_families)
+    models = []
+    macs = []
+    for i in range(count):
+        ap_model = ap_models[i % len(ap_models)]
+        ouis = sorted(MerakiBssidCalculator.ap_offset(ap_model))
+        models.append(ap_model)
+        macs.append(ouis[i % len(ouis)] + ':' + MerakiBssidCalculator.format_mac(i * 7919)[9:])
+    return (models,macs)
+
+
+heavy_modules = ('numpy','requests','meraki')
+import_modules = ('meraki_bssid_calculator','meraki_bssid_getter','meraki_bssid_cli')
+
+
+def import_time(statement,repeat):
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')
+    script = (
+        'import sys,time\n'
+        'started = time.perf_counter()\n' + statement + '\n'
+        'seconds = time.perf_counter() - started\n'
+        'import json\n'
+        'print(json.dumps([seconds,[name for name in ' + repr(list(heavy_modules)) + ' if name in sys.modules]]))\n'
+    )
+    runs = []
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable,'-c',script],cwd=root)
+        runs.append(json.loads(output.decode()))
+    return min(runs)
+
+
+def bench_import(args):
+    results = []
+    for module in import_modules:
+        seconds,loaded = import_time('import ' + module,args.repeat)
+        entry = result('import',{'module': module},seconds,1)
+        entry['heavy_modules'] = loaded
+        results.append(entry)
+    return results
+
+
+def import_regressions(results,budget):
+    regressions = []
+    for entry in results:
+        if (entry['name'] == 'import'):
+            if entry['heavy_modules']:
+                regressions.append(entry['params']['module'] + ' imports ' + ', '.join(entry['heavy_modules']))
+            if (budget is not None) and (entry['seconds'] * 1000 > budget):
+                regressions.append('%s takes %.1fms to import, over the %.1fms budget' % (entry['params']['module'],entry['seconds'] * 1000,budget))
+    return regressions
+
+
+def bench_calculate(args):
+    from meraki_bssid_calculator import MerakiBssidCalculator
+    results = []
+    for family,ouis in sorted(MerakiBssidCalculator.offset_families.items()):
+        ap_model = sorted(model for model,model_family in MerakiBssidCalculator.ap_families.items() if model_family == family)[0]
+        for oui in sorted(ouis):
+            ap_mac = oui + ':12:34:56'
+            number = 10000
+            seconds = best_time(lambda: MerakiBssidCalculator.calculate(ap_model,ap_mac,7),args.repeat,number)
+            results.append(result('calculate',{'family': family, 'model': ap_model, 'oui': oui},seconds,1))
+    return results
+
+
+def bench_batch(args):
+    import meraki_bssid_calculator
+    from meraki_bssid_calculator import MerakiBssidCalculator
+    models,macs = sample_macs(args.batch_size)
+    ssid_numbers = [(i % 15) + 1 for i in range(args.batch_size)]
+    params = {'pairs': args.batch_size}
+    results = []
+
+    def scalar_loop():
+        for ap_model,ap_mac,ssid_number in zip(models,macs,ssid_numbers):
+            MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number)
+
+    results.append(result('batch_scalar_loop',params,best_time(scalar_loop,args.repeat),args.batch_size))
+    numpy = meraki_bssid_calculator.load_numpy()
+    if (numpy is not None):
+        seconds = best_time(lambda: MerakiBssidCalculator.calculate_many(models,macs,ssid_numbers),args.repeat)
+        results.append(result('batch_numpy',params,seconds,args.batch_size))
+    meraki_bssid_calculator.numpy = None
+    try:
+        seconds = best_time(lambda: MerakiBssidCalculator.calculate_many(models,macs,ssid_numbers),args.repeat)
+        results.append(result('batch_python',params,seconds,args.batch_size))
+    finally:
+        meraki_bssid_calculator.numpy = numpy
+    return results
+
+
+def bench_index(args):
+    from meraki_bssid_calculator import MerakiBssidCalculator
+    from meraki_bssid_index import BssidIndex
+    models,macs = sample_macs(args.index_aps)
+    inventory = list(zip(models,macs))
+    params = {'aps': args.index_aps}
+    results = [result('index_build',params,best_time(lambda: BssidIndex(inventory),args.repeat),args.index_aps)]
+    index = BssidIndex(inventory)
+    bssids = [MerakiBssidCalculator.calculate(ap_model,ap_mac,(i % 15) + 1)['5'] for i,(ap_model,ap_mac) in enumerate(inventory[:10000])]
+    results.append(result('index_lookup',params,best_time(lambda: [index.lookup(bssid) for bssid in bssids],args.repeat),len(bssids)))
+    results.append(result('index_lookup_many',params,best_time(lambda: index.lookup_many(bssids),args.repeat),len(bssids)))
+    return results
+
+
+def bench_memory(args):
+    import bench_memory
+    pairs = args.batch_size
+    results = []
+    for name,build in (('memory_dict_bssid',bench_memory.build_dict_bssids),('memory_bssid',bench_memory.build_bssids)):
+        memory = bench_memory.measure(build,pairs)
+        results.append({'name': name, 'params': {'pairs': pairs}, 'bytes': memory, 'bytes_per_pair': memory / float(pairs)})
+    return results
+
+
+def bench_getter(args,org):
+    from meraki_bssid_getter import MerakiBssidGetter
+    params = {
+        'networks': args.networks,
+        'aps_per_network': args.aps_per_network,
+        'templates': args.templates,
+        'ssids_per_network': args.ssids_per_network,
+        'latency': args.latency
+    }
+    results = []
+    for workers in sorted(set([1,args.workers])):
+        def make_getter():
+            getter = MerakiBssidGetter('fake-key',workers=workers)
+            if (workers > 1):
+                getter.dashboard = org
+            return getter
+
+        def get_org_bssids():
+            make_getter().get_org_bssids('1')
+
+        def export_org_bssids_to_csv():
+            with tempfile.TemporaryDirectory() as directory:
+                make_getter().export_org_bssids_to_csv('1',os.path.join(directory,'bssids.csv'))
+
+        rows = sum(len(network_bssids) for network_bssids in quiet(make_getter().get_org_bssids,'1').values())
+        for name,function in (('getter_get_org_bssids',get_org_bssids),('getter_export_csv',export_org_bssids_to_csv)):
+            org.calls.clear()
+            seconds = best_time(lambda: quiet(function),args.repeat)
+            entry = result(name,dict(params,workers=workers),seconds,rows)
+            entry['api_calls'] = dict((endpoint,calls // args.repeat) for endpoint,calls in org.calls.items())
+            results.append(entry)
+    return results
+
+
+def quiet(function,*args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def metadata():
+    import meraki_bssid_calculator
+    try:
+        commit = subprocess.check_output(
+            ['git','rev-parse','HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError,subprocess.CalledProcessError):
+        commit = None
+    numpy = meraki_bssid_calculator.load_numpy()
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'numpy': numpy.__version__ if numpy is not None else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Meraki bssid calculator and getter.')
+    parser.add_argument('-o','--output',default='benchmark_results.json',help='json results file (default benchmark_results.json)')
+    parser.add_argument('--only',action='append',choices=['import','calculate','batch','index','memory','getter'],help='run only these benchmarks')
+    parser.add_argument('--repeat',type=int,default=3,help='runs per benchmark, the best is kept (default 3)')
+    parser.add_argument('--import-budget',type=float,default=None,help='milliseconds each import may take before the run fails')
+    parser.add_argument('--batch-size',type=int,default=100000,help='ap/ssid pairs for the batch and memory benchmarks')
+    parser.add_argument('--index-aps',type=int,default=10000,help='aps in the index benchmark')
+    parser.add_argument('--networks',type=int,default=200,help='networks in the fake org')
+    parser.add_argument('--aps-per-network',type=int,default=10,help='aps per network in the fake org')
+    parser.add_argument('--templates',type=int,default=4,help='config templates in the fake org')
+    parser.add_argument('--ssids-per-network',type=int,default=4,help='enabled ssids per network or template')
+    parser.add_argument('--latency',type=float,default=0.0,help='seconds of latency per fake dashboard call')
+    parser.add_argument('--workers',type=int,default=8,help='worker threads for the concurrent getter run')
+    args = parser.parse_args(argv)
+
+    org = fake_meraki.FakeOrg(
+        networks=args.networks,
+        aps_per_network=args.aps_per_network,
+        templates=args.templates,
+        ssids_per_network=args.ssids_per_network,
+        latency=args.latency
+    )
+    fake_meraki.install(org)
+
+    benchmarks = [
+        ('import',bench_import),
+        ('calculate',bench_calculate),
+        ('batch',bench_batch),
+        ('index',bench_index),
+        ('memory',bench_memory),
+        ('getter',lambda args: bench_getter(args,org))
+    ]
+    results = []
+    for name,benchmark in benchmarks:
+        if (args.only is None) or (name in args.only):
+            sys.stderr.write('running ' + name + '\n')
+            results.extend(benchmark(args))
+    with open(args.output,'w') as outfile:
+        json.dump({'metadata': metadata(), 'results': results},outfile,indent=2)
+    for entry in results:
+        if ('seconds' in entry):
+            sys.stderr.write('%-24s %-60s %12.1f ops/s\n' % (entry['name'],json.dumps(entry['params']),entry['operations_per_second']))
+        else:
+            sys.stderr.write('%-24s %-60s %12.1f bytes/pair\n' % (entry['name'],json.dumps(entry['params']),entry['bytes_per_pair']))
+    regressions = import_regressions(results,args.import_budget)
+    for regression in regressions:
+        sys.stderr.write('import regression: ' + regression + '\n')
+    if regressions:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
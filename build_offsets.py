@@ -0,0 +1,70 @@
+# Writes meraki_bssid_offsets.py, the precompiled offset tables MerakiBssidCalculator loads
+# at import instead of compiling offset_families itself.
+#
+# Run it after changing offset_families:
+#   python build_offsets.py
+#
+# or check that the shipped tables still match offset_families (exits 1 when they don't):
+#   python build_offsets.py --check
+#
+# tests/test_offsets.py runs the check, so the tests fail while the tables are stale.
+
+import argparse
+import hashlib
+import os
+import sys
+
+sys.modules['meraki_bssid_offsets'] = None
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+
+offsets_filename = os.path.join(os.path.dirname(os.path.abspath(__file__)),'meraki_bssid_offsets.py')
+
+
+def source_digest():
+    return hashlib.sha1(repr(MerakiBssidCalculator.offset_families).encode('utf-8')).hexdigest()
+
+
+def render_offsets():
+    lines = [
+        '# Precompiled offset tables for MerakiBssidCalculator, generated by build_offsets.py.',
+        '# Don\'t edit by hand: change offset_families and rerun python build_offsets.py.',
+        '#',
+        '# family -> (oui, band, ssid number) -> compile_offset output, i.e. (delta, guard) or None.',
+        '',
+        'source_digest = ' + repr(source_digest()),
+        '',
+        'family_offsets = {'
+    ]
+    for family,compiled in MerakiBssidCalculator.compile_family_offsets().items():
+        lines.append('    ' + repr(family) + ': {')
+        for key,compiled_offset in compiled.items():
+            lines.append('        ' + repr(key) + ': ' + repr(compiled_offset) + ',')
+        lines.append('    },')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the precompiled Meraki bssid offset tables.')
+    parser.add_argument('--check',action='store_true',help='only check that ' + os.path.basename(offsets_filename) + ' is up to date')
+    args = parser.parse_args(argv)
+    rendered = render_offsets()
+    if args.check:
+        try:
+            with open(offsets_filename) as offsetsfile:
+                current = offsetsfile.read()
+        except IOError:
+            current = None
+        if (current != rendered):
+            sys.stderr.write(offsets_filename + ' is out of date, run python build_offsets.py\n')
+            return 1
+        return 0
+    with open(offsets_filename + '.tmp','w') as offsetsfile:
+        offsetsfile.write(rendered)
+    os.replace(offsets_filename + '.tmp',offsets_filename)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
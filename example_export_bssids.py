@@ -1,5 +1,8 @@
 
 from meraki_bssid_getter import MerakiBssidGetter
+import logging
+
+logging.basicConfig(level=logging.INFO,format='%(message)s')
 
 api_key = 'cc54e1f9520616813f654aab8e0dfc614e33c179 '
 
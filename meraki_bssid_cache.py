@@ -0,0 +1,86 @@
+# A persistent cache of dashboard responses for MerakiBssidGetter, kept in a sqlite file.
+#
+#   cache = ResponseCache('meraki_responses.sqlite')
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',response_cache=cache)
+#
+# Responses are stored per endpoint (getnetworklist, getorginventory, getssids) and id (the
+# org or network id), and reused until they're older than that endpoint's ttl in seconds.
+# default_ttl applies to endpoints without one of their own; a ttl of None never expires:
+#   cache = ResponseCache('meraki_responses.sqlite',ttls={'getssids': 300},default_ttl=3600)
+#
+# Entries can be dropped explicitly, all of them, one endpoint's or a single one:
+#   cache.invalidate()
+#   cache.invalidate('getssids')
+#   cache.invalidate('getorginventory','org-id-here')
+#
+# With offline=True the getter never calls the dashboard and uses cached responses whatever
+# their age, raising CacheMiss for anything that was never cached:
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',response_cache=cache,offline=True)
+#
+# The cache can be shared by the getter's worker threads, and by several processes since
+# sqlite locks the file.
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class CacheMiss(KeyError):
+    pass
+
+
+class ResponseCache:
+    def __init__(self,filename='meraki_responses.sqlite',ttls=None,default_ttl=3600):
+        self.filename = filename
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename,timeout=30,check_same_thread=False)
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'endpoint TEXT NOT NULL, key TEXT NOT NULL, fetched REAL NOT NULL, body TEXT NOT NULL, '
+                'PRIMARY KEY (endpoint,key))'
+            )
+            self.connection.commit()
+
+    def get(self,endpoint,key,ignore_ttl=False):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT fetched,body FROM responses WHERE endpoint = ? AND key = ?',
+                (endpoint,str(key))
+            ).fetchone()
+        if (row is None):
+            return None
+        fetched,body = row
+        ttl = self.ttls.get(endpoint,self.default_ttl)
+        if not ignore_ttl and (ttl is not None) and (time.time() - fetched > ttl):
+            return None
+        return json.loads(body)
+
+    def put(self,endpoint,key,response):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses (endpoint,key,fetched,body) VALUES (?,?,?,?)',
+                (endpoint,str(key),time.time(),json.dumps(response))
+            )
+            self.connection.commit()
+
+    def invalidate(self,endpoint=None,key=None):
+        if (endpoint is None) and (key is not None):
+            raise ValueError('invalidating a key needs its endpoint')
+        with self.lock:
+            if (endpoint is None):
+                self.connection.execute('DELETE FROM responses')
+            elif (key is None):
+                self.connection.execute('DELETE FROM responses WHERE endpoint = ?',(endpoint,))
+            else:
+                self.connection.execute('DELETE FROM responses WHERE endpoint = ? AND key = ?',(endpoint,str(key)))
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
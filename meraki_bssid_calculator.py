@@ -16,6 +16,66 @@
 #
 # will output the bssid for each radio:
 # {'2.4': '22:8d:db:00:00:00', '5': '22:8d:cb:00:00:00'}
+#
+# To calculate every ssid of one ap at once (the mac is only parsed once) use:
+# MerakiBssidCalculator.calculate_all("MR53","0c:8d:db:00:00:00")
+#
+# which outputs both radios per ssid number, for ssids 1-15 unless ssid_numbers is given:
+# {1: {'2.4': '0c:8d:db:00:00:00', '5': '0e:8d:cb:00:00:00'}, 2: {...}, ...}
+#
+# or, to keep the bssids as 48-bit integers and format them later, with format_mac:
+# MerakiBssidCalculator.calculate_all_values("MR53","0c:8d:db:00:00:00")
+#
+# which outputs a (2.4, 5) pair per ssid number.  A bssid the per octet calculation has to
+# work out (see compile_offsets) comes back as its string instead:
+# {1: (13803404132352, 16002158952448), 2: (...), ...}
+#
+# To calculate bssids for many ap/ssid pairs at once use the batch function:
+# MerakiBssidCalculator.calculate_many(ap_models,ap_macs,ssid_numbers)
+#
+# ap_models and ssid_numbers can be sequences or a single value used for every row.
+# ap_macs can be a sequence of mac strings, a sequence/array of integers or a packed
+# buffer of 6 byte macs.  The output holds one list per radio, in the same order as the input:
+# {'2.4': ['22:8d:db:00:00:00', ...], '5': ['22:8d:cb:00:00:00', ...]}
+#
+# When numpy is installed the batch is calculated in one vectorized pass, otherwise it
+# falls back to calling calculate for each row.  numpy takes far longer to import than the
+# calculator itself, so it's only imported the first time a batch needs it.
+#
+# The offset tables are compiled ahead of time into meraki_bssid_offsets, so importing the
+# calculator doesn't redo that work on every start.  After changing offset_families, rebuild
+# them with:
+#   python build_offsets.py
+#
+# tests/test_offsets.py fails while the shipped tables don't match offset_families.
+
+import itertools
+
+try:
+    from meraki_bssid_offsets import family_offsets as precompiled_offsets
+except ImportError:
+    precompiled_offsets = None
+
+numpy = None
+numpy_checked = False
+
+
+def load_numpy():
+    global numpy, numpy_checked
+    if not numpy_checked:
+        numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy is not None:
+            MerakiBssidCalculator.hex_chars = numpy.frombuffer(b"0123456789abcdef",dtype=numpy.uint8)
+            MerakiBssidCalculator.hex_digits = numpy.full(256,0xff,dtype=numpy.uint8)
+            for i,digit in enumerate(b"0123456789abcdef"):
+                MerakiBssidCalculator.hex_digits[digit] = i
+                MerakiBssidCalculator.hex_digits[ord(chr(digit).upper())] = i
+    return numpy
+
 
 class MerakiBssidCalculator:
     offset_families = {
@@ -371,18 +431,300 @@ class MerakiBssidCalculator:
         return MerakiBssidCalculator.offset_families[MerakiBssidCalculator.ap_families[ap_model]]
 
     def calculate(ap_model,ap_mac,ssid_number):
-        bssids = { 
-            "2.4": MerakiBssidCalculator.calculate_bssid(
+        oui = ap_mac[:8]
+        offset_24 = MerakiBssidCalculator.compiled_offsets[(ap_model,oui,"2.4",ssid_number)]
+        offset_5 = MerakiBssidCalculator.compiled_offsets[(ap_model,oui,"5",ssid_number)]
+        mac_value = MerakiBssidCalculator.mac_value(ap_mac)
+        bssids = {
+            "2.4": MerakiBssidCalculator.compiled_bssid(ap_model,ap_mac,mac_value,offset_24,"2.4",ssid_number),
+            "5": MerakiBssidCalculator.compiled_bssid(ap_model,ap_mac,mac_value,offset_5,"5",ssid_number)
+        }
+        return bssids
+
+    def calculate_all(ap_model,ap_mac,ssid_numbers=range(1,16)):
+        oui = ap_mac[:8]
+        mac_value = MerakiBssidCalculator.mac_value(ap_mac)
+        compiled_offsets = MerakiBssidCalculator.compiled_offsets
+        compiled_bssid = MerakiBssidCalculator.compiled_bssid
+        block = {}
+        for ssid_number in ssid_numbers:
+            block[ssid_number] = {
+                "2.4": compiled_bssid(ap_model,ap_mac,mac_value,compiled_offsets[(ap_model,oui,"2.4",ssid_number)],"2.4",ssid_number),
+                "5": compiled_bssid(ap_model,ap_mac,mac_value,compiled_offsets[(ap_model,oui,"5",ssid_number)],"5",ssid_number)
+            }
+        return block
+
+    def calculate_all_values(ap_model,ap_mac,ssid_numbers=range(1,16)):
+        oui = ap_mac[:8]
+        mac_value = MerakiBssidCalculator.mac_value(ap_mac)
+        compiled_offsets = MerakiBssidCalculator.compiled_offsets
+        compiled_value = MerakiBssidCalculator.compiled_value
+        block = {}
+        for ssid_number in ssid_numbers:
+            block[ssid_number] = (
+                compiled_value(ap_model,ap_mac,mac_value,compiled_offsets[(ap_model,oui,"2.4",ssid_number)],"2.4",ssid_number),
+                compiled_value(ap_model,ap_mac,mac_value,compiled_offsets[(ap_model,oui,"5",ssid_number)],"5",ssid_number)
+            )
+        return block
+
+    def compiled_value(ap_model,ap_mac,mac_value,compiled_offset,band,ssid_number):
+        bssid_value = MerakiBssidCalculator.apply_offset(mac_value,compiled_offset)
+        if bssid_value is None:
+            return MerakiBssidCalculator.calculate_bssid(
                 ap_mac,
-                MerakiBssidCalculator.ap_offset(ap_model)[ap_mac[:8]]["2.4"][ssid_number]
-            ),
-            "5": MerakiBssidCalculator.calculate_bssid(
-                    ap_mac,
-                    MerakiBssidCalculator.ap_offset(ap_model)[ap_mac[:8]]["5"][ssid_number]
+                MerakiBssidCalculator.ap_offset(ap_model)[ap_mac[:8]][band][ssid_number]
             )
-        }
+        return bssid_value
+
+    def compiled_bssid(ap_model,ap_mac,mac_value,compiled_offset,band,ssid_number):
+        bssid_value = MerakiBssidCalculator.apply_offset(mac_value,compiled_offset)
+        if bssid_value is None:
+            return MerakiBssidCalculator.calculate_bssid(
+                ap_mac,
+                MerakiBssidCalculator.ap_offset(ap_model)[ap_mac[:8]][band][ssid_number]
+            )
+        return MerakiBssidCalculator.format_mac(bssid_value)
+
+    # The compiled engine flattens offset_families x ap_families into a single table keyed by
+    # (ap model, oui, band, ssid number), expanded from a table per family (the precompiled one
+    # in meraki_bssid_offsets when it's there).  Each entry holds the offsets folded into one signed
+    # 48-bit delta, so a bssid is the ap mac as an integer plus that delta.
+    #
+    # That only holds while every octet stays within 0x00-0xff, since calculate_octet never
+    # carries into the neighbouring octet.  Octets 1-3 are fixed by the oui and are checked
+    # here; offsets on octets 4-6 are kept as a guard and checked per mac.  Anything that
+    # would carry (or a mac that isn't in the usual xx:xx:xx:xx:xx:xx form) is handed back to
+    # calculate_bssid so the output stays identical to the per octet calculation.
+    def compile_offsets(family_offsets=None):
+        if family_offsets is None:
+            family_offsets = MerakiBssidCalculator.compile_family_offsets()
+        return dict(
+            ((ap_model,) + key,compiled_offset)
+            for ap_model,family in MerakiBssidCalculator.ap_families.items()
+            for key,compiled_offset in family_offsets[family].items()
+        )
+
+    def compile_family_offsets():
+        family_offsets = {}
+        for family,ouis in MerakiBssidCalculator.offset_families.items():
+            compiled = family_offsets[family] = {}
+            for oui,radios in ouis.items():
+                oui_octets = [int(octet,16) for octet in oui.split(":")]
+                for band,ssids in radios.items():
+                    for ssid_number,offsets in ssids.items():
+                        compiled[(oui,band,ssid_number)] = MerakiBssidCalculator.compile_offset(oui_octets,offsets)
+        return family_offsets
+
+    def compile_offset(oui_octets,offsets):
+        for i,octet in enumerate(oui_octets):
+            if not (0 <= octet + offsets[i+1] <= 0xff):
+                return None
+        delta = 0
+        guard = []
+        for i in range(1,7):
+            shift = 8 * (6 - i)
+            delta += offsets[i] << shift
+            if (i > 3) and (offsets[i] != 0):
+                guard.append((shift,offsets[i]))
+        return (delta,tuple(guard))
+
+    def apply_offset(mac_value,compiled_offset):
+        if (mac_value is None) or (compiled_offset is None):
+            return None
+        delta,guard = compiled_offset
+        for shift,offset in guard:
+            if not (0 <= ((mac_value >> shift) & 0xff) + offset <= 0xff):
+                return None
+        return mac_value + delta
+
+    def mac_value(ap_mac):
+        if (len(ap_mac) != 17) or (ap_mac[2::3] != ":::::"):
+            return None
+        # int(...,16) would also take whitespace and "_" separators, so only accept the 6 hex octets
+        try:
+            octets = bytes.fromhex(ap_mac.replace(":",""))
+        except ValueError:
+            return None
+        if (len(octets) != 6):
+            return None
+        return int.from_bytes(octets,"big")
+
+    def format_mac(mac_value):
+        return mac_value.to_bytes(6,"big").hex(":")
+
+    def calculate_many(ap_models,ap_macs,ssid_numbers):
+        if isinstance(ap_macs,(bytes,bytearray,memoryview)):
+            ap_macs = MerakiBssidCalculator.unpack_macs(ap_macs)
+        count = len(ap_macs)
+        if isinstance(ap_models,str):
+            ap_models = [ap_models] * count
+        if isinstance(ssid_numbers,int):
+            ssid_numbers = [ssid_numbers] * count
+        if (len(ap_models) != count) or (len(ssid_numbers) != count):
+            raise ValueError("ap_models, ap_macs and ssid_numbers must be the same length")
+        if (count > 0) and (load_numpy() is not None):
+            bssids = MerakiBssidCalculator.calculate_many_numpy(ap_models,ap_macs,ssid_numbers)
+            if bssids is not None:
+                return bssids
+        return MerakiBssidCalculator.calculate_many_python(ap_models,ap_macs,ssid_numbers)
+
+    def calculate_many_python(ap_models,ap_macs,ssid_numbers):
+        bssids = {"2.4": [], "5": []}
+        for ap_model,ap_mac,ssid_number in zip(ap_models,ap_macs,ssid_numbers):
+            if not isinstance(ap_mac,str):
+                ap_mac = MerakiBssidCalculator.format_mac(int(ap_mac))
+            ap_bssids = MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number)
+            bssids["2.4"].append(ap_bssids["2.4"])
+            bssids["5"].append(ap_bssids["5"])
         return bssids
 
+    def unpack_macs(packed_macs):
+        packed_macs = bytes(packed_macs)
+        if len(packed_macs) % 6 != 0:
+            raise ValueError("packed macs must be a multiple of 6 bytes")
+        if load_numpy() is not None:
+            return numpy.frombuffer(packed_macs,dtype=numpy.uint8).reshape(-1,6)
+        return [int.from_bytes(packed_macs[i:i+6],"big") for i in range(0,len(packed_macs),6)]
+
+    # The vectorized path resolves each row to an index into batch_lookup() (a dense copy of
+    # compiled_offsets) and applies the deltas to every row at once.  Rows that need the per
+    # octet calculation, or that aren't plain lowercase-oui macs, are handed to calculate one
+    # at a time so the output (and any KeyError) matches the scalar path exactly.
+    # Returns None when the input can't be vectorized, e.g. ssid numbers that aren't integers.
+    def calculate_many_numpy(ap_models,ap_macs,ssid_numbers):
+        lookup = MerakiBssidCalculator.batch_lookup()
+        ssid_numbers = numpy.asarray(ssid_numbers)
+        if ssid_numbers.dtype.kind not in "iu":
+            return None
+        macs = MerakiBssidCalculator.numpy_macs(ap_macs)
+        if macs is None:
+            return None
+        mac_values,vectorized = macs
+        count = len(mac_values)
+        model_rows = numpy.fromiter(map(lookup["models"].get,ap_models,itertools.repeat(-1)),dtype=numpy.int64,count=count)
+        oui_values = (mac_values >> numpy.uint64(24)).astype(numpy.int64)
+        oui_positions = numpy.minimum(numpy.searchsorted(lookup["oui_values"],oui_values),len(lookup["oui_values"]) - 1)
+        oui_rows = numpy.where(lookup["oui_values"][oui_positions] == oui_values,oui_positions,-1)
+        ssid_rows = ssid_numbers.astype(numpy.int64)
+        found = (model_rows >= 0) & (oui_rows >= 0) & (ssid_rows >= 0) & (ssid_rows < lookup["present"].shape[3])
+        found &= lookup["present"][numpy.where(found,model_rows,0),numpy.where(found,oui_rows,0),0,numpy.where(found,ssid_rows,0)]
+        missing = numpy.flatnonzero(vectorized & ~found)
+        if len(missing) > 0:
+            for row in numpy.flatnonzero(~vectorized[:missing[0]+1]).tolist() + [missing[0]]:
+                MerakiBssidCalculator.calculate_row(ap_models,ap_macs,mac_values,ssid_numbers,row)
+        vectorized &= found
+        index = (numpy.where(vectorized,model_rows,0),numpy.where(vectorized,oui_rows,0))
+        ssid_rows = numpy.where(vectorized,ssid_rows,0)
+        fallback = ~vectorized
+        bssid_values = []
+        for band_row in range(len(MerakiBssidCalculator.bands)):
+            band_index = index + (band_row,ssid_rows)
+            fallback |= lookup["legacy"][band_index]
+            guards = lookup["guards"][band_index]
+            for octet,shift in enumerate((16,8,0)):
+                shifted = ((mac_values >> numpy.uint64(shift)) & numpy.uint64(0xff)).astype(numpy.int64) + guards[:,octet]
+                fallback |= (shifted < 0) | (shifted > 0xff)
+            bssid_values.append(mac_values.astype(numpy.int64) + lookup["deltas"][band_index])
+        bssids = {}
+        for band,band_values in zip(MerakiBssidCalculator.bands,bssid_values):
+            bssids[band] = MerakiBssidCalculator.format_macs(numpy.where(fallback,0,band_values))
+        for row in numpy.flatnonzero(fallback).tolist():
+            row_bssids = MerakiBssidCalculator.calculate_row(ap_models,ap_macs,mac_values,ssid_numbers,row)
+            for band in MerakiBssidCalculator.bands:
+                bssids[band][row] = row_bssids[band]
+        return bssids
+
+    def calculate_row(ap_models,ap_macs,mac_values,ssid_numbers,row):
+        ap_mac = ap_macs[row]
+        if not isinstance(ap_mac,str):
+            ap_mac = MerakiBssidCalculator.format_mac(int(mac_values[row]))
+        return MerakiBssidCalculator.calculate(str(ap_models[row]),ap_mac,ssid_numbers[row].item())
+
+    # Returns the macs as uint64 values and whether each row can be vectorized.  String macs
+    # are only vectorized when they're in the xx:xx:xx:xx:xx:xx form with a lowercase oui,
+    # since calculate looks the oui up exactly as written.
+    def numpy_macs(ap_macs):
+        if isinstance(ap_macs,numpy.ndarray) and (ap_macs.dtype == numpy.uint8) and (ap_macs.ndim == 2):
+            octets = ap_macs.astype(numpy.uint64)
+            mac_values = numpy.zeros(len(ap_macs),dtype=numpy.uint64)
+            for i in range(6):
+                mac_values = (mac_values << numpy.uint64(8)) | octets[:,i]
+            return (mac_values,numpy.ones(len(mac_values),dtype=bool))
+        macs = ap_macs
+        if not (isinstance(macs,numpy.ndarray) and (macs.dtype.kind in "iu")):
+            try:
+                return MerakiBssidCalculator.numpy_mac_strings(ap_macs)
+            except TypeError:
+                macs = numpy.asarray(ap_macs)
+            if macs.dtype.kind not in "iu":
+                return None
+        if (macs < 0).any() or (macs > 0xffffffffffff).any():
+            raise OverflowError("mac values must fit in 48 bits")
+        return (macs.astype(numpy.uint64),numpy.ones(len(macs),dtype=bool))
+
+    def numpy_mac_strings(ap_macs):
+        count = len(ap_macs)
+        lengths = numpy.fromiter(map(len,ap_macs),dtype=numpy.int64,count=count)
+        vectorized = lengths == 17
+        if vectorized.all():
+            text = "".join(ap_macs)
+        else:
+            text = "".join([ap_mac if len(ap_mac) == 17 else "00:00:00:00:00:00" for ap_mac in ap_macs])
+        try:
+            chars = numpy.frombuffer(text.encode("ascii"),dtype=numpy.uint8).reshape(count,17)
+        except UnicodeEncodeError:
+            return None
+        digits = MerakiBssidCalculator.hex_digits[chars[:,[i for i in range(17) if i % 3 != 2]]]
+        vectorized &= (chars[:,2:17:3] == ord(":")).all(axis=1) & (digits <= 0xf).all(axis=1)
+        vectorized &= ~((chars[:,:8] >= ord("A")) & (chars[:,:8] <= ord("F"))).any(axis=1)
+        mac_values = numpy.zeros(count,dtype=numpy.uint64)
+        for i in range(12):
+            mac_values = (mac_values << numpy.uint64(4)) | (digits[:,i].astype(numpy.uint64) & numpy.uint64(0xf))
+        return (mac_values,vectorized)
+
+    def format_macs(mac_values):
+        octets = mac_values.astype(">u8").view(numpy.uint8).reshape(-1,8)[:,2:]
+        chars = numpy.full((len(mac_values),18),ord(":"),dtype=numpy.uint8)
+        chars[:,0::3] = MerakiBssidCalculator.hex_chars[octets >> 4]
+        chars[:,1::3] = MerakiBssidCalculator.hex_chars[octets & 0xf]
+        chars[:,17] = ord("\n")
+        return chars.tobytes().decode("ascii").split("\n")[:-1]
+
+    def batch_lookup():
+        if MerakiBssidCalculator.compiled_lookup is None:
+            compiled_offsets = MerakiBssidCalculator.compiled_offsets
+            models = {}
+            ssids = 0
+            for (ap_model,oui,band,ssid_number) in compiled_offsets:
+                models.setdefault(ap_model,len(models))
+                ssids = max(ssids,ssid_number + 1)
+            ouis = sorted(set(oui for (ap_model,oui,band,ssid_number) in compiled_offsets))
+            ouis = dict((oui,i) for i,oui in enumerate(ouis))
+            shape = (len(models),len(ouis),len(MerakiBssidCalculator.bands),ssids)
+            deltas = numpy.zeros(shape,dtype=numpy.int64)
+            present = numpy.zeros(shape,dtype=bool)
+            legacy = numpy.zeros(shape,dtype=bool)
+            guards = numpy.zeros(shape + (3,),dtype=numpy.int64)
+            for (ap_model,oui,band,ssid_number),compiled_offset in compiled_offsets.items():
+                index = (models[ap_model],ouis[oui],MerakiBssidCalculator.bands.index(band),ssid_number)
+                present[index] = True
+                if compiled_offset is None:
+                    legacy[index] = True
+                    continue
+                delta,guard = compiled_offset
+                deltas[index] = delta
+                for shift,offset in guard:
+                    guards[index + (2 - shift // 8,)] = offset
+            MerakiBssidCalculator.compiled_lookup = {
+                "models": models,
+                "oui_values": numpy.array([int(oui.replace(":",""),16) for oui in ouis],dtype=numpy.int64),
+                "deltas": deltas,
+                "present": present,
+                "legacy": legacy,
+                "guards": guards
+            }
+        return MerakiBssidCalculator.compiled_lookup
+
     def calculate_bssid(ap_mac,offsets):
         ap_octets = ap_mac.split(":")
         bssid_octets = []
@@ -393,5 +735,6 @@ class MerakiBssidCalculator:
     def calculate_octet(octet,offset):
         return hex(int(octet,16) + offset)[2:].zfill(2)
 
-
-
+MerakiBssidCalculator.bands = ("2.4","5")
+MerakiBssidCalculator.compiled_offsets = MerakiBssidCalculator.compile_offsets(precompiled_offsets)
+MerakiBssidCalculator.compiled_lookup = None
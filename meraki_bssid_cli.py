@@ -0,0 +1,122 @@
+# Command line batch mode for MerakiBssidCalculator, no dashboard access needed.
+#
+# Reads model,mac[,ssid] rows from a file or stdin and writes the bssids for each as csv
+# or json lines.  The ssid column uses the calculator's numbering (1-15); leave it out to
+# get every ssid for that ap.  A header row starting with 'model' is skipped.
+#   python meraki_bssid_cli.py inventory.csv -o bssids.csv
+#   cat inventory.csv | python meraki_bssid_cli.py --format jsonl --workers 8
+#
+# Input is read and calculated in chunks, optionally on a pool of worker processes.  At
+# most a couple of chunks per worker are in flight and output is written in input order,
+# so memory stays bounded and the output is the same whatever the worker count.
+#
+# Rows that can't be calculated (unknown model, oui or ssid, or a malformed mac) are
+# reported on stderr and skipped; the exit status is 1 when that happens.
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_parallel import imap_ordered
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import sys
+
+all_ssid_numbers = range(1,16)
+output_header = ['ap_model','ap_mac','ssid_number','bssid_24','bssid_5']
+
+
+def read_chunks(infile,chunk_size):
+    chunk = []
+    for line_number,row in enumerate(csv.reader(infile),1):
+        if (len(row) == 0) or (row[0].strip() == ''):
+            continue
+        if (line_number == 1) and (row[0].strip().lower() in ('model','ap_model')):
+            continue
+        chunk.append((line_number,row))
+        if (len(chunk) >= chunk_size):
+            yield chunk
+            chunk = []
+    if (len(chunk) > 0):
+        yield chunk
+
+
+def calculate_chunk(chunk):
+    ap_models = []
+    ap_macs = []
+    ssid_numbers = []
+    errors = []
+    for line_number,row in chunk:
+        ap_model = row[0].strip()
+        ap_mac = row[1].strip().lower() if len(row) > 1 else ''
+        if (len(row) > 2) and (row[2].strip() != ''):
+            try:
+                numbers = [int(row[2])]
+            except ValueError:
+                errors.append('line ' + str(line_number) + ': invalid ssid number ' + row[2])
+                continue
+        else:
+            numbers = all_ssid_numbers
+        if (MerakiBssidCalculator.mac_value(ap_mac) is None):
+            errors.append('line ' + str(line_number) + ': invalid mac ' + ap_mac)
+            continue
+        # every model/oui in the offset tables has all 15 ssids, so checking the first is enough
+        if ((ap_model,ap_mac[:8],'2.4',numbers[0]) not in MerakiBssidCalculator.compiled_offsets):
+            errors.append('line ' + str(line_number) + ': no offsets for ' + ap_model + ' ' + ap_mac + ' ssid ' + str(numbers[0]))
+            continue
+        ap_models.extend([ap_model] * len(numbers))
+        ap_macs.extend([ap_mac] * len(numbers))
+        ssid_numbers.extend(numbers)
+    rows = []
+    if (len(ap_models) > 0):
+        bssids = MerakiBssidCalculator.calculate_many(ap_models,ap_macs,ssid_numbers)
+        rows = list(zip(ap_models,ap_macs,ssid_numbers,bssids['2.4'],bssids['5']))
+    return (rows,errors)
+
+
+def write_rows(outfile,output_format,rows):
+    if (output_format == 'jsonl'):
+        for ap_model,ap_mac,ssid_number,bssid_24,bssid_5 in rows:
+            outfile.write(json.dumps({'model': ap_model, 'mac': ap_mac, 'ssid_number': ssid_number, '2.4': bssid_24, '5': bssid_5}) + '\n')
+    else:
+        csv.writer(outfile,lineterminator='\n').writerows(rows)
+
+
+def run(infile,outfile,output_format='csv',workers=1,chunk_size=10000):
+    skipped = 0
+    if (output_format == 'csv'):
+        csv.writer(outfile,lineterminator='\n').writerow(output_header)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for rows,errors in imap_ordered(executor,calculate_chunk,read_chunks(infile,chunk_size),window=workers*2):
+            write_rows(outfile,output_format,rows)
+            for error in errors:
+                sys.stderr.write(error + '\n')
+            skipped += len(errors)
+    finally:
+        if (executor is not None):
+            executor.shutdown()
+    return skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculate Meraki bssids for model,mac[,ssid] rows.')
+    parser.add_argument('input',nargs='?',default='-',help='input csv file, - for stdin (default)')
+    parser.add_argument('-o','--output',default='-',help='output file, - for stdout (default)')
+    parser.add_argument('--format',choices=['csv','jsonl'],default='csv',help='output format (default csv)')
+    parser.add_argument('--workers',type=int,default=1,help='worker processes (default 1, no pool)')
+    parser.add_argument('--chunk-size',type=int,default=10000,help='input rows per chunk (default 10000)')
+    args = parser.parse_args(argv)
+    infile = sys.stdin if args.input == '-' else open(args.input,newline='')
+    outfile = sys.stdout if args.output == '-' else open(args.output,'w',newline='')
+    try:
+        skipped = run(infile,outfile,args.format,max(args.workers,1),max(args.chunk_size,1))
+    finally:
+        if (infile is not sys.stdin):
+            infile.close()
+        if (outfile is not sys.stdout):
+            outfile.close()
+    return 1 if skipped > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,93 +10,462 @@
 #   exporting to csv:
 #   bssid_getter.export_org_bssids_to_csv('org-id-here','output-filename.csv')
 #
+#   or streaming it, one csv row at a time as each network is calculated:
+#   for row in bssid_getter.iter_org_bssids('org-id-here'):
+#       network_name,ssid_name,ap_mac,bssid_24,bssid_5 = row
+#
+# The csv export is written from iter_org_bssids, so memory use stays flat however big the org is.
+#
+#   exporting to csv and a memory mappable bssid table (see meraki_bssid_table) for lookups:
+#   bssid_getter.export_org_bssids_to_csv('org-id-here','output-filename.csv',table_filename='bssids.table')
+#
+#   exporting to a sqlite database, indexed by bssid, ap mac and network (see meraki_bssid_sqlite):
+#   bssid_getter.export_org_bssids_to_sqlite('org-id-here','bssids.sqlite')
+#
+#   exporting incrementally against the snapshot of the previous run:
+#   bssid_getter.export_org_bssids_incremental('org-id-here','output-filename.csv',
+#       snapshot_filename='bssids.snapshot.json',delta_filename='bssids.delta.csv')
+#
+# The snapshot keeps a hash of each network's access points and enabled ssids along with its
+# bssid rows.  Only networks where either hash changed are recalculated; the rest are copied
+# from the snapshot.  The full csv is rewritten as usual and the delta csv lists the rows
+# that were added, removed or changed since the snapshot, keyed by network, ssid number and ap.
+#
 # You'll need the id for the organization you want the bssid information for.  
 # You can get this information by using the meraki lib function: meraki.myorgaccess('your-api-key')
+# To export many organizations at once, across worker processes, see meraki_bssid_orgs.
+#
+# The org inventory is indexed by network once, when it's fetched.  If you already have the
+# inventory (the output of meraki.getorginventory) you can pass it in instead of refetching it:
+#   bssid_info = bssid_getter.get_org_bssids('org-id-here',inventory=inventory)
+#
+# or group the access points by network yourself:
+#   aps_by_network = index_aps_by_network(inventory)
+#
+# For large orgs the ssid lookups can be made concurrently.  The getter then uses a
+# DashboardClient that shares one connection pool between its workers, keeps to the org's
+# request rate (5 per second by default) and backs off when the dashboard answers 429:
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',workers=8,rate_limit=5)
+#
+# Results come back in the same order as the serial getter.  base_url points the client
+# at another dashboard host, e.g. a local stub server.
+#
+# Ssids are looked up once per network or config template, so networks bound to the same
+# template share one lookup.  By default that cache only lives for one run; set
+# ssid_cache_ttl (in seconds) to reuse ssid lists across runs of the same getter:
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',ssid_cache_ttl=300)
+#
+# Dashboard responses can also be kept on disk between runs, with a ttl per endpoint, and
+# offline=True runs entirely from that cache (see meraki_bssid_cache):
+#   cache = ResponseCache('meraki_responses.sqlite',ttls={'getssids': 300})
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',response_cache=cache)
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',response_cache=cache,offline=True)
+#
+# Progress is logged to the 'meraki_bssid_getter' logger at INFO level, one line per network,
+# so enable logging to see it.  For timings and counters (per phase time, api call counts and
+# latencies, rows per second, cache hits) pass a hooks object, see meraki_bssid_metrics:
+#   stats = RunStats()
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',hooks=stats)
+#
+# log_summary=True records those stats itself and logs them as json at the end of each run.
+#
+# The meraki lib and the DashboardClient (and the http stack under them) are only imported
+# when the getter first talks to the dashboard, so importing this module to use Bssid or
+# index_aps_by_network stays cheap.
 
-from meraki import meraki
 from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_metrics import PhaseTimer, RunHooks, RunStats
+from meraki_bssid_table import BssidTableWriter
+from concurrent.futures import ThreadPoolExecutor
 import json
 import csv
+import hashlib
+import logging
+import os
+import sys
+import time
 
+# Bssid keeps one ap/ssid pair.  There's one per pair in an org, so it's kept small: no
+# __dict__, the two bssids stored as 48-bit integers and the ssid name interned.  The bssids
+# are only formatted back into strings when they're read through .bssids.  A bssid that
+# isn't a plain 6 octet mac (the calculator can return octets above 0xff) is kept as is.
+#
+# The getter builds them with from_values, straight from calculate_all_values, so the
+# bssids are never formatted and parsed back on the way in.
 class Bssid:
-    def __init__(self,ssid,ap,bssids):
-        self.ssid = ssid
+    __slots__ = ('ssid','ap','ssid_number','bssid_24','bssid_5')
+
+    def __init__(self,ssid,ap,bssids,ssid_number=None):
+        self.ssid = sys.intern(ssid)
         self.ap = ap
+        self.ssid_number = ssid_number
         self.bssids = bssids
 
+    @property
+    def bssids(self):
+        return {
+            '2.4': Bssid.format_bssid(self.bssid_24),
+            '5': Bssid.format_bssid(self.bssid_5)
+        }
+
+    @bssids.setter
+    def bssids(self,bssids):
+        self.bssid_24 = Bssid.pack_bssid(bssids['2.4'])
+        self.bssid_5 = Bssid.pack_bssid(bssids['5'])
+
+    def from_values(ssid,ap,bssid_24,bssid_5,ssid_number=None):
+        bssid = Bssid.__new__(Bssid)
+        bssid.ssid = sys.intern(ssid)
+        bssid.ap = ap
+        bssid.ssid_number = ssid_number
+        bssid.bssid_24 = bssid_24
+        bssid.bssid_5 = bssid_5
+        return bssid
+
+    def pack_bssid(bssid):
+        bssid_value = MerakiBssidCalculator.mac_value(bssid)
+        if (bssid_value is None) or (MerakiBssidCalculator.format_mac(bssid_value) != bssid):
+            return bssid
+        return bssid_value
+
+    def format_bssid(bssid):
+        if isinstance(bssid,int):
+            return MerakiBssidCalculator.format_mac(bssid)
+        return bssid
+
     def __str__(self):
         return "{ ssid: " + self.ssid + ", ap: " + self.ap + ", bssids: " + json.dumps(self.bssids) + " }"
 
 
+csv_header = ['Network name', 'SSID name', 'AP mac', '2.4 BSSID', '5 BSSID']
+delta_csv_header = ['Change'] + csv_header
+snapshot_version = 1
+
+logger = logging.getLogger(__name__)
+
+
+def index_aps_by_network(inventory):
+    aps_by_network = {}
+    for device in inventory:
+        if (device['model'][:2] == "MR"):
+            aps_by_network.setdefault(device['networkId'],[]).append(device)
+    return aps_by_network
+
+
 class MerakiBssidGetter:
-    def __init__(self,api_key):
+    def __init__(self,api_key,workers=1,rate_limit=5,base_url=None,ssid_cache_ttl=None,hooks=None,log_summary=False,response_cache=None,offline=False):
+        if offline and (response_cache is None):
+            raise ValueError('offline needs a response_cache')
         self.api_key = api_key
+        if (hooks is None):
+            hooks = RunStats() if log_summary else RunHooks()
+        self.hooks = hooks
+        self.log_summary = log_summary
+        self.workers = workers
+        self.ssid_cache_ttl = ssid_cache_ttl
+        self.ssid_cache = {}
+        self.response_cache = response_cache
+        self.offline = offline
+        self.dashboard = None
+        if not offline and ((workers > 1) or (base_url is not None)):
+            from meraki_dashboard_client import DashboardClient
+            self.dashboard = DashboardClient(api_key,base_url=base_url,rate_limit=rate_limit,pool_size=workers)
 
-    def get_org_bssids(self,org_id):
-        org_networks = meraki.getnetworklist(self.api_key,org_id,suppressprint=True)
-        self.org_inventory = meraki.getorginventory(self.api_key,org_id,suppressprint=True)
+    def get_org_bssids(self,org_id,inventory=None):
         bssids = {}
-        for network in org_networks:
-            bssids[network['name']] = self.__get_bssids_for_network(network)
+        for network,network_bssids in self.__iter_network_bssids(org_id,inventory):
+            bssids[network['name']] = network_bssids
         return bssids
 
-    def export_org_bssids_to_csv(self,org_id,filename='bssids.csv'):
-        bssids = self.get_org_bssids(org_id)
-        output = [
-            ['Network name', 'SSID name', 'AP mac', '2.4 BSSID', '5 BSSID']
-        ]
-        for network in bssids:
-            for bssid in bssids[network]:
-                output_line = [
-                    network,
-                    bssid.ssid,
-                    bssid.ap,
-                    bssid.bssids['2.4'],
-                    bssid.bssids['5']
-                ]
-                output.append(output_line)
+    def iter_org_bssids(self,org_id,inventory=None):
+        for network,rows in self.__iter_network_rows(org_id,inventory):
+            for row in rows:
+                yield row
+
+    def load_inventory(self,inventory):
+        self.org_inventory = inventory
+        self.aps_by_network = index_aps_by_network(inventory)
+
+    def export_org_bssids_to_csv(self,org_id,filename='bssids.csv',table_filename=None):
+        table_writer = None
+        if (table_filename is not None):
+            table_writer = BssidTableWriter(table_filename)
         with open(filename,'w') as outfile:
             output_writer = csv.writer(
                 outfile,
                 lineterminator='\n'
             )
-            for line in output:
-                output_writer.writerow(line)
-
-    def __get_bssids_for_network(self,network):
-        print('Getting bssid\'s for network: ' + network['name'])
-        aps = self.__get_aps_for_network(network)
-        if (len(aps) > 0):
-            ssids = self.__get_ssids_for_network(network)
-        else:
-            ssids = []
-        bssids = []
-        for ssid in ssids:
-            for ap in aps:
-                bssids.append(
-                    Bssid(
-                        ssid=ssid['name'],
-                        ap=ap['mac'],
-                        bssids=MerakiBssidCalculator.calculate(ap['model'],ap['mac'],ssid['number']+1)
-                ))
+            output_writer.writerow(csv_header)
+            for network,rows in self.__iter_network_rows(org_id,None):
+                with PhaseTimer(self.hooks,'write'):
+                    output_writer.writerows(rows)
+                    if (table_writer is not None):
+                        for row in rows:
+                            table_writer.add_row(row)
+        if (table_writer is not None):
+            with PhaseTimer(self.hooks,'write'):
+                table_writer.close()
+
+    def export_org_bssids_to_sqlite(self,org_id,filename='bssids.sqlite',batch_size=10000):
+        from meraki_bssid_sqlite import BssidDatabaseWriter
+        database_writer = BssidDatabaseWriter(filename,org_id,batch_size=batch_size)
+        try:
+            for network,network_bssids in self.__iter_network_bssids(org_id,None):
+                with PhaseTimer(self.hooks,'write'):
+                    for bssid in network_bssids:
+                        database_writer.add_bssid(network,bssid)
+        except BaseException:
+            database_writer.abort()
+            raise
+        with PhaseTimer(self.hooks,'write'):
+            return database_writer.close()
+
+    def export_org_bssids_incremental(self,org_id,filename='bssids.csv',snapshot_filename='bssids.snapshot.json',delta_filename='bssids.delta.csv'):
+        previous = self.__load_snapshot(snapshot_filename)
+        snapshot = {}
+        summary = {'networks': 0, 'recalculated': 0, 'added': 0, 'removed': 0, 'changed': 0}
+        with open(filename,'w') as outfile, open(delta_filename,'w') as deltafile:
+            output_writer = csv.writer(outfile,lineterminator='\n')
+            delta_writer = csv.writer(deltafile,lineterminator='\n')
+            output_writer.writerow(csv_header)
+            delta_writer.writerow(delta_csv_header)
+            for network,ssids in self.__iter_network_ssids(org_id,None):
+                entry = {
+                    'name': network['name'],
+                    'inventory': self.__hash([[ap['model'],ap['mac']] for ap in self.__get_aps_for_network(network)],sort=True),
+                    'ssids': self.__hash([[ssid['number'],ssid['name']] for ssid in ssids])
+                }
+                previous_entry = previous.pop(network['id'],None)
+                if (previous_entry is not None) and all(previous_entry[key] == entry[key] for key in ('name','inventory','ssids')):
+                    entry['rows'] = previous_entry['rows']
+                    self.hooks.rows_produced(len(entry['rows']))
+                else:
+                    entry['rows'] = [
+                        [bssid.ssid_number,bssid.ssid,bssid.ap,Bssid.format_bssid(bssid.bssid_24),Bssid.format_bssid(bssid.bssid_5)]
+                        for bssid in self.__get_bssids_for_network(network,ssids)
+                    ]
+                    summary['recalculated'] += 1
+                    self.__write_delta(delta_writer,summary,entry,previous_entry)
+                snapshot[network['id']] = entry
+                summary['networks'] += 1
+                with PhaseTimer(self.hooks,'write'):
+                    for row in entry['rows']:
+                        output_writer.writerow([entry['name']] + row[1:])
+            with PhaseTimer(self.hooks,'write'):
+                for previous_entry in previous.values():
+                    self.__write_delta(delta_writer,summary,None,previous_entry)
+        with PhaseTimer(self.hooks,'write'):
+            self.__save_snapshot(snapshot_filename,snapshot)
+        return summary
+
+    def __write_delta(self,delta_writer,summary,entry,previous_entry):
+        previous_rows = {}
+        if (previous_entry is not None):
+            for row in previous_entry['rows']:
+                previous_rows[(row[0],row[2])] = [previous_entry['name']] + row[1:]
+        if (entry is not None):
+            for row in entry['rows']:
+                output_row = [entry['name']] + row[1:]
+                previous_row = previous_rows.pop((row[0],row[2]),None)
+                if (previous_row is None):
+                    delta_writer.writerow(['added'] + output_row)
+                    summary['added'] += 1
+                elif (previous_row != output_row):
+                    delta_writer.writerow(['changed'] + output_row)
+                    summary['changed'] += 1
+        for previous_row in previous_rows.values():
+            delta_writer.writerow(['removed'] + previous_row)
+            summary['removed'] += 1
+
+    def __hash(self,value,sort=False):
+        if sort:
+            value = sorted(value)
+        return hashlib.sha1(json.dumps(value,separators=(',',':')).encode('utf-8')).hexdigest()
+
+    def __load_snapshot(self,snapshot_filename):
+        if not os.path.exists(snapshot_filename):
+            return {}
+        with open(snapshot_filename) as snapshotfile:
+            snapshot = json.load(snapshotfile)
+        if (snapshot.get('version') != snapshot_version):
+            return {}
+        return snapshot['networks']
+
+    def __save_snapshot(self,snapshot_filename,snapshot):
+        with open(snapshot_filename + '.tmp','w') as snapshotfile:
+            json.dump({'version': snapshot_version, 'networks': snapshot},snapshotfile,separators=(',',':'))
+        os.replace(snapshot_filename + '.tmp',snapshot_filename)
+
+    def __iter_network_rows(self,org_id,inventory):
+        for network,network_bssids in self.__iter_network_bssids(org_id,inventory):
+            with PhaseTimer(self.hooks,'calculate'):
+                rows = [
+                    [
+                        network['name'],
+                        bssid.ssid,
+                        bssid.ap,
+                        Bssid.format_bssid(bssid.bssid_24),
+                        Bssid.format_bssid(bssid.bssid_5)
+                    ]
+                    for bssid in network_bssids
+                ]
+            yield (network,rows)
+
+    def __iter_network_bssids(self,org_id,inventory):
+        for network,ssids in self.__iter_network_ssids(org_id,inventory):
+            yield (network,self.__get_bssids_for_network(network,ssids))
+
+    def __iter_network_ssids(self,org_id,inventory):
+        self.hooks.run_started()
+        try:
+            with PhaseTimer(self.hooks,'networks'):
+                org_networks = self.__get_networks(org_id)
+            if (inventory is None):
+                with PhaseTimer(self.hooks,'inventory'):
+                    inventory = self.__get_inventory(org_id)
+            with PhaseTimer(self.hooks,'ap_index'):
+                self.load_inventory(inventory)
+            for network,ssids in zip(org_networks,self.__get_ssids_for_networks(org_networks)):
+                yield (network,ssids)
+        finally:
+            self.hooks.run_finished()
+            if self.log_summary and hasattr(self.hooks,'summary'):
+                logger.info('Run summary: %s',json.dumps(self.hooks.summary()))
+
+    def __get_bssids_for_network(self,network,ssids):
+        logger.info('Getting bssid\'s for network: %s',network['name'])
+        with PhaseTimer(self.hooks,'calculate'):
+            aps = self.__get_aps_for_network(network)
+            ssid_numbers = [ssid['number']+1 for ssid in ssids]
+            ap_blocks = [MerakiBssidCalculator.calculate_all_values(ap['model'],ap['mac'],ssid_numbers) for ap in aps]
+            bssids = []
+            for ssid in ssids:
+                for ap,ap_block in zip(aps,ap_blocks):
+                    bssid_24,bssid_5 = ap_block[ssid['number']+1]
+                    bssids.append(Bssid.from_values(ssid['name'],ap['mac'],bssid_24,bssid_5,ssid['number']))
+        self.hooks.rows_produced(len(bssids))
         return bssids
 
     def __get_aps_for_network(self,network):
-        aps = []
-        for device in self.org_inventory:
-            if ((device['model'][:2] == "MR") and (device['networkId'] == network['id'])):
-                aps.append(device)
-        return aps
+        return self.aps_by_network.get(network['id'],[])
 
-    def __get_ssids_for_network(self,network):
-        ssids = []
-        if ('configTemplateId' in network):
-            network_id = network['configTemplateId']
+    # Yields the enabled ssids of each network, in order.  Each network or config template
+    # is looked up once and kept in ssid_cache; networks without access points aren't looked
+    # up at all.  With more than one worker the uncached ids are fetched on a thread pool and
+    # executor.map hands them back in the order they're first needed.  If a fetch fails or the
+    # caller stops early, the fetches that haven't started are cancelled rather than sent.
+    def __get_ssids_for_networks(self,networks):
+        self.__expire_ssid_cache()
+        network_ids = [self.__get_ssid_network_id(network) for network in networks]
+        if (self.workers > 1):
+            # dict.fromkeys keeps the first occurrence of each id in order, without a scan per id
+            uncached = list(dict.fromkeys(
+                network_id for network_id in network_ids
+                if (network_id is not None) and (network_id not in self.ssid_cache)
+            ))
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            try:
+                fetched = zip(uncached,executor.map(self.__fetch_ssids,uncached))
+                for network_id in network_ids:
+                    self.__count_ssid_cache(network_id)
+                    with PhaseTimer(self.hooks,'ssids'):
+                        while (network_id is not None) and (network_id not in self.ssid_cache):
+                            fetched_id,ssids = next(fetched)
+                            self.ssid_cache[fetched_id] = (time.monotonic(),ssids)
+                    yield self.__get_cached_ssids(network_id)
+            finally:
+                executor.shutdown(cancel_futures=True)
+        else:
+            for network_id in network_ids:
+                self.__count_ssid_cache(network_id)
+                if (network_id is not None) and (network_id not in self.ssid_cache):
+                    with PhaseTimer(self.hooks,'ssids'):
+                        self.ssid_cache[network_id] = (time.monotonic(),self.__fetch_ssids(network_id))
+                yield self.__get_cached_ssids(network_id)
+
+    def __count_ssid_cache(self,network_id):
+        if (network_id is None):
+            return
+        if (network_id in self.ssid_cache):
+            self.hooks.cache_hit('ssids')
         else:
-            network_id = network['id']
-        for ssid in meraki.getssids(self.api_key,network_id,suppressprint=True):
+            self.hooks.cache_miss('ssids')
+
+    def __get_ssid_network_id(self,network):
+        if (len(self.__get_aps_for_network(network)) == 0):
+            return None
+        if ('configTemplateId' in network):
+            return network['configTemplateId']
+        return network['id']
+
+    def __get_cached_ssids(self,network_id):
+        if (network_id is None):
+            return []
+        return self.ssid_cache[network_id][1]
+
+    def __expire_ssid_cache(self):
+        if (self.ssid_cache_ttl is None):
+            self.ssid_cache = {}
+            return
+        now = time.monotonic()
+        for network_id,(fetched,ssids) in list(self.ssid_cache.items()):
+            if (now - fetched > self.ssid_cache_ttl):
+                del self.ssid_cache[network_id]
+
+    def __fetch_ssids(self,network_id):
+        ssids = []
+        for ssid in self.__get_ssids(network_id):
             if (ssid['enabled'] == True):
                 ssids.append(ssid)
         return ssids
 
+    def __get_networks(self,org_id):
+        return self.__cached_response('getnetworklist',org_id,self.__request_networks)
+
+    def __get_inventory(self,org_id):
+        return self.__cached_response('getorginventory',org_id,self.__request_inventory)
+
+    def __get_ssids(self,network_id):
+        return self.__cached_response('getssids',network_id,self.__request_ssids)
+
+    def __cached_response(self,endpoint,key,request):
+        if (self.response_cache is None):
+            return request(key)
+        response = self.response_cache.get(endpoint,key,ignore_ttl=self.offline)
+        if (response is not None):
+            self.hooks.cache_hit(endpoint)
+            return response
+        self.hooks.cache_miss(endpoint)
+        if self.offline:
+            from meraki_bssid_cache import CacheMiss
+            raise CacheMiss('no cached ' + endpoint + ' response for ' + str(key))
+        response = request(key)
+        self.response_cache.put(endpoint,key,response)
+        return response
+
+    def __request_networks(self,org_id):
+        if (self.dashboard is not None):
+            return self.__api_call('getnetworklist',self.dashboard.getnetworklist,org_id)
+        from meraki import meraki
+        return self.__api_call('getnetworklist',meraki.getnetworklist,self.api_key,org_id,suppressprint=True)
+
+    def __request_inventory(self,org_id):
+        if (self.dashboard is not None):
+            return self.__api_call('getorginventory',self.dashboard.getorginventory,org_id)
+        from meraki import meraki
+        return self.__api_call('getorginventory',meraki.getorginventory,self.api_key,org_id,suppressprint=True)
+
+    def __request_ssids(self,network_id):
+        if (self.dashboard is not None):
+            return self.__api_call('getssids',self.dashboard.getssids,network_id)
+        from meraki import meraki
+        return self.__api_call('getssids',meraki.getssids,self.api_key,network_id,suppressprint=True)
+
+    def __api_call(self,endpoint,function,*args,**kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args,**kwargs)
+        finally:
+            self.hooks.api_call(endpoint,time.perf_counter() - started)
+
 
@@ -0,0 +1,142 @@
+# BssidIndex resolves an observed bssid back to the Meraki AP and SSID that broadcasts it.
+#
+# Build it from an inventory, either the device list returned by meraki.getorginventory
+# or a list of (ap_model,ap_mac) pairs:
+#   index = BssidIndex(meraki.getorginventory(api_key,org_id,suppressprint=True))
+#
+# Then look bssids up one at a time or in bulk:
+#   index.lookup('22:8d:db:00:00:00')
+#   index.lookup_many(['22:8d:db:00:00:00','22:8d:cb:00:00:00'])
+#
+# A lookup returns a BssidMatch (or None when the bssid isn't one of ours):
+#   BssidMatch(ap_mac='0c:8d:db:00:00:00', model='MR53', ssid_number=12, band='2.4', network_id='N_1234')
+#
+# ssid_number uses the calculator's numbering (1-15).  Devices that aren't access points
+# the calculator knows about are skipped, so the org inventory can be passed in as is.
+#
+# Every bssid an ap can emit is precomputed from the calculator's compiled offset tables.
+# The bssids are kept as sorted 48-bit integers in an array, next to a parallel array of
+# packed (ap, band, ssid) entries, so an index over 100k aps is a few flat arrays (~12 bytes
+# per bssid) and a lookup is a binary search over them.  When two aps can emit the same
+# bssid, lookup returns the first one and lookup_all returns every match.  With numpy the
+# arrays are sorted and lookup_many searched in one pass; numpy is only imported the first
+# time an index needs it, as with the calculator's batches.
+
+from meraki_bssid_calculator import MerakiBssidCalculator, load_numpy
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+BssidMatch = namedtuple('BssidMatch',['ap_mac','model','ssid_number','band','network_id'])
+
+
+class BssidIndex:
+    ssid_numbers = range(1,16)
+
+    def __init__(self,inventory):
+        self.ap_macs = array('Q')
+        self.ap_models = []
+        self.ap_networks = []
+        bssids = array('Q')
+        entries = array('I')
+        for device in inventory:
+            self.__add_ap(device,bssids,entries)
+        self.__sort(bssids,entries)
+
+    def __len__(self):
+        return len(self.bssids)
+
+    def lookup(self,bssid):
+        matches = self.__matches(self.__bssid_value(bssid),first_only=True)
+        if (len(matches) > 0):
+            return matches[0]
+        return None
+
+    def lookup_all(self,bssid):
+        return self.__matches(self.__bssid_value(bssid))
+
+    def lookup_many(self,bssids):
+        numpy = load_numpy()
+        if (numpy is None) or (len(self.bssids) == 0):
+            return [self.lookup(bssid) for bssid in bssids]
+        bssid_values = [self.__bssid_value(bssid) for bssid in bssids]
+        keys = numpy.frombuffer(self.bssids,dtype=numpy.uint64)
+        searchable = numpy.array([-1 if value is None else value for value in bssid_values],dtype=numpy.int64)
+        positions = numpy.searchsorted(keys,searchable.astype(numpy.uint64)).tolist()
+        matches = []
+        for bssid_value,position in zip(bssid_values,positions):
+            if (bssid_value is not None) and (position < len(self.bssids)) and (self.bssids[position] == bssid_value):
+                matches.append(self.__match(position))
+            else:
+                matches.append(None)
+        return matches
+
+    def __matches(self,bssid_value,first_only=False):
+        matches = []
+        if (bssid_value is None):
+            return matches
+        position = bisect_left(self.bssids,bssid_value)
+        while (position < len(self.bssids)) and (self.bssids[position] == bssid_value):
+            matches.append(self.__match(position))
+            if first_only:
+                break
+            position += 1
+        return matches
+
+    def __match(self,position):
+        entry = self.entries[position]
+        ap_index = entry >> 5
+        return BssidMatch(
+            ap_mac=MerakiBssidCalculator.format_mac(self.ap_macs[ap_index]),
+            model=self.ap_models[ap_index],
+            ssid_number=entry & 0xf,
+            band=MerakiBssidCalculator.bands[(entry >> 4) & 0x1],
+            network_id=self.ap_networks[ap_index]
+        )
+
+    def __bssid_value(self,bssid):
+        if isinstance(bssid,int):
+            return bssid
+        return MerakiBssidCalculator.mac_value(bssid.lower())
+
+    def __add_ap(self,device,bssids,entries):
+        if isinstance(device,dict):
+            ap_model = device.get('model')
+            ap_mac = device.get('mac')
+            network_id = device.get('networkId')
+        else:
+            ap_model = device[0]
+            ap_mac = device[1]
+            network_id = device[2] if len(device) > 2 else None
+        if (ap_model is None) or (ap_mac is None):
+            return
+        ap_mac = ap_mac.lower()
+        mac_value = MerakiBssidCalculator.mac_value(ap_mac)
+        oui = ap_mac[:8]
+        compiled_offsets = MerakiBssidCalculator.compiled_offsets
+        if (mac_value is None) or ((ap_model,oui,MerakiBssidCalculator.bands[0],1) not in compiled_offsets):
+            return
+        ap_index = len(self.ap_models)
+        self.ap_macs.append(mac_value)
+        self.ap_models.append(ap_model)
+        self.ap_networks.append(network_id)
+        for band_index,band in enumerate(MerakiBssidCalculator.bands):
+            for ssid_number in self.ssid_numbers:
+                # bssids the per octet calculation would push outside 0x00-0xff can't be seen over the air
+                bssid_value = MerakiBssidCalculator.apply_offset(mac_value,compiled_offsets.get((ap_model,oui,band,ssid_number)))
+                if (bssid_value is not None):
+                    bssids.append(bssid_value)
+                    entries.append((ap_index << 5) | (band_index << 4) | ssid_number)
+
+    def __sort(self,bssids,entries):
+        self.bssids = array('Q')
+        self.entries = array('I')
+        numpy = load_numpy()
+        if (numpy is not None):
+            order = numpy.argsort(numpy.frombuffer(bssids,dtype=numpy.uint64),kind='stable')
+            self.bssids.frombytes(numpy.frombuffer(bssids,dtype=numpy.uint64)[order].tobytes())
+            self.entries.frombytes(numpy.frombuffer(entries,dtype=numpy.uint32)[order].tobytes())
+        else:
+            order = sorted(range(len(bssids)),key=bssids.__getitem__)
+            self.bssids.extend(bssids[i] for i in order)
+            self.entries.extend(entries[i] for i in order)
@@ -0,0 +1,134 @@
+# Instrumentation hooks for MerakiBssidGetter runs.
+#
+# The getter reports what it's doing to a hooks object.  RunHooks is the interface and does
+# nothing, which is the getter's default.  RunStats records a run:
+#   stats = RunStats()
+#   bssid_getter = MerakiBssidGetter('your-api-key-here',hooks=stats)
+#   bssid_getter.export_org_bssids_to_csv('org-id-here','output-filename.csv')
+#   stats.summary()
+#
+# The summary is a dict that can go straight to json:
+#   seconds          wall time of the run
+#   phases           seconds spent in each phase: networks, inventory, ap_index, ssids,
+#                    calculate and write (phases interleave while streaming, so they're summed)
+#   api_calls        per endpoint call count, total seconds and a latency histogram
+#   rows             ap/ssid rows produced, and rows_per_second
+#   caches           hits and misses per cache (ssids)
+#
+# Hooks can be called from the getter's worker threads, so implementations need to be
+# thread safe.  Subclass RunHooks and override what you need to feed other systems.
+
+import threading
+import time
+
+latency_buckets = (0.01,0.025,0.05,0.1,0.25,0.5,1.0,2.5,5.0,10.0)
+
+
+class RunHooks:
+    def run_started(self):
+        pass
+
+    def run_finished(self):
+        pass
+
+    def phase_finished(self,phase,seconds):
+        pass
+
+    def api_call(self,endpoint,seconds):
+        pass
+
+    def rows_produced(self,rows):
+        pass
+
+    def cache_hit(self,cache):
+        pass
+
+    def cache_miss(self,cache):
+        pass
+
+
+class RunStats(RunHooks):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.run_started()
+
+    def run_started(self):
+        with self.lock:
+            self.started = time.perf_counter()
+            self.finished = None
+            self.phases = {}
+            self.api_calls = {}
+            self.rows = 0
+            self.caches = {}
+
+    def run_finished(self):
+        with self.lock:
+            self.finished = time.perf_counter()
+
+    def phase_finished(self,phase,seconds):
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase,0.0) + seconds
+
+    def api_call(self,endpoint,seconds):
+        with self.lock:
+            calls = self.api_calls.get(endpoint)
+            if (calls is None):
+                calls = {'count': 0, 'seconds': 0.0, 'histogram': [0] * (len(latency_buckets) + 1)}
+                self.api_calls[endpoint] = calls
+            calls['count'] += 1
+            calls['seconds'] += seconds
+            bucket = 0
+            while (bucket < len(latency_buckets)) and (seconds > latency_buckets[bucket]):
+                bucket += 1
+            calls['histogram'][bucket] += 1
+
+    def rows_produced(self,rows):
+        with self.lock:
+            self.rows += rows
+
+    def cache_hit(self,cache):
+        self.__count_cache(cache,'hits')
+
+    def cache_miss(self,cache):
+        self.__count_cache(cache,'misses')
+
+    def summary(self):
+        with self.lock:
+            finished = self.finished if self.finished is not None else time.perf_counter()
+            seconds = finished - self.started
+            api_calls = {}
+            for endpoint,calls in self.api_calls.items():
+                histogram = {}
+                for bucket,count in enumerate(calls['histogram']):
+                    if (bucket < len(latency_buckets)):
+                        histogram['<=' + str(latency_buckets[bucket])] = count
+                    else:
+                        histogram['>' + str(latency_buckets[-1])] = count
+                api_calls[endpoint] = {'count': calls['count'], 'seconds': calls['seconds'], 'histogram': histogram}
+            return {
+                'seconds': seconds,
+                'phases': dict(self.phases),
+                'api_calls': api_calls,
+                'rows': self.rows,
+                'rows_per_second': self.rows / seconds if seconds > 0 else None,
+                'caches': dict((cache,dict(counts)) for cache,counts in self.caches.items())
+            }
+
+    def __count_cache(self,cache,result):
+        with self.lock:
+            counts = self.caches.setdefault(cache,{'hits': 0, 'misses': 0})
+            counts[result] += 1
+
+
+class PhaseTimer:
+    def __init__(self,hooks,phase):
+        self.hooks = hooks
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.hooks.phase_finished(self.phase,time.perf_counter() - self.started)
+        return False
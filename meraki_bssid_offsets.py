@@ -0,0 +1,285 @@
+# Precompiled offset tables for MerakiBssidCalculator, generated by build_offsets.py.
+# Don't edit by hand: change offset_families and rerun python build_offsets.py.
+#
+# family -> (oui, band, ssid number) -> compile_offset output, i.e. (delta, guard) or None.
+
+source_digest = 'aff78804055f074b05a0426ae1de304fb008d0fc'
+
+family_offsets = {
+    1: {
+        ('00:18:0a', '2.4', 1): (0, ()),
+        ('00:18:0a', '2.4', 2): (6597069766656, ()),
+        ('00:18:0a', '2.4', 3): (10995116277760, ()),
+        ('00:18:0a', '2.4', 4): (15393162788864, ()),
+        ('00:18:0a', '2.4', 5): (19791209299968, ()),
+        ('00:18:0a', '2.4', 6): (24189255811072, ()),
+        ('00:18:0a', '2.4', 7): (28587302322176, ()),
+        ('00:18:0a', '2.4', 8): (32985348833280, ()),
+        ('00:18:0a', '2.4', 9): (37383395344384, ()),
+        ('00:18:0a', '2.4', 10): (41781441855488, ()),
+        ('00:18:0a', '2.4', 11): (46179488366592, ()),
+        ('00:18:0a', '2.4', 12): (50577534877696, ()),
+        ('00:18:0a', '2.4', 13): (54975581388800, ()),
+        ('00:18:0a', '2.4', 14): (59373627899904, ()),
+        ('00:18:0a', '2.4', 15): (63771674411008, ()),
+        ('00:18:0a', '5', 1): (2199291691008, ()),
+        ('00:18:0a', '5', 2): (6597338202112, ()),
+        ('00:18:0a', '5', 3): (10995384713216, ()),
+        ('00:18:0a', '5', 4): (15393431224320, ()),
+        ('00:18:0a', '5', 5): (19791477735424, ()),
+        ('00:18:0a', '5', 6): (24189524246528, ()),
+        ('00:18:0a', '5', 7): (28587570757632, ()),
+        ('00:18:0a', '5', 8): (32985617268736, ()),
+        ('00:18:0a', '5', 9): (37383663779840, ()),
+        ('00:18:0a', '5', 10): (41781710290944, ()),
+        ('00:18:0a', '5', 11): (46179756802048, ()),
+        ('00:18:0a', '5', 12): (50577803313152, ()),
+        ('00:18:0a', '5', 13): (54975849824256, ()),
+        ('00:18:0a', '5', 14): (59373896335360, ()),
+        ('00:18:0a', '5', 15): (63771942846464, ()),
+        ('88:15:44', '2.4', 1): (0, ()),
+        ('88:15:44', '2.4', 2): (6597069766656, ()),
+        ('88:15:44', '2.4', 3): (-6597069766656, ()),
+        ('88:15:44', '2.4', 4): (-2199023255552, ()),
+        ('88:15:44', '2.4', 5): (19791209299968, ()),
+        ('88:15:44', '2.4', 6): (24189255811072, ()),
+        ('88:15:44', '2.4', 7): (10995116277760, ()),
+        ('88:15:44', '2.4', 8): (15393162788864, ()),
+        ('88:15:44', '2.4', 9): (37383395344384, ()),
+        ('88:15:44', '2.4', 10): (41781441855488, ()),
+        ('88:15:44', '2.4', 11): (28587302322176, ()),
+        ('88:15:44', '2.4', 12): (32985348833280, ()),
+        ('88:15:44', '2.4', 13): (54975581388800, ()),
+        ('88:15:44', '2.4', 14): (59373627899904, ()),
+        ('88:15:44', '2.4', 15): (46179488366592, ()),
+        ('88:15:44', '5', 1): (2199291691008, ()),
+        ('88:15:44', '5', 2): (6597338202112, ()),
+        ('88:15:44', '5', 3): (-6596801331200, ()),
+        ('88:15:44', '5', 4): (-2198754820096, ()),
+        ('88:15:44', '5', 5): (19791477735424, ()),
+        ('88:15:44', '5', 6): (24189524246528, ()),
+        ('88:15:44', '5', 7): (10995384713216, ()),
+        ('88:15:44', '5', 8): (15393431224320, ()),
+        ('88:15:44', '5', 9): (37383663779840, ()),
+        ('88:15:44', '5', 10): (41781710290944, ()),
+        ('88:15:44', '5', 11): (28587570757632, ()),
+        ('88:15:44', '5', 12): (32985617268736, ()),
+        ('88:15:44', '5', 13): (54975849824256, ()),
+        ('88:15:44', '5', 14): (59373896335360, ()),
+        ('88:15:44', '5', 15): (46179756802048, ()),
+    },
+    2: {
+        ('00:18:0a', '2.4', 1): (2200096997376, ()),
+        ('00:18:0a', '2.4', 2): (2200096997377, ((0, 1),)),
+        ('00:18:0a', '2.4', 3): (2200096997378, ((0, 2),)),
+        ('00:18:0a', '2.4', 4): (2200096997379, ((0, 3),)),
+        ('00:18:0a', '2.4', 5): (2200096997380, ((0, 4),)),
+        ('00:18:0a', '2.4', 6): (2200096997381, ((0, 5),)),
+        ('00:18:0a', '2.4', 7): (2200096997382, ((0, 6),)),
+        ('00:18:0a', '2.4', 8): (2200096997383, ((0, 7),)),
+        ('00:18:0a', '2.4', 9): (2200096997384, ((0, 8),)),
+        ('00:18:0a', '2.4', 10): (2200096997385, ((0, 9),)),
+        ('00:18:0a', '2.4', 11): (2200096997386, ((0, 10),)),
+        ('00:18:0a', '2.4', 12): (2200096997387, ((0, 11),)),
+        ('00:18:0a', '2.4', 13): (2200096997388, ((0, 12),)),
+        ('00:18:0a', '2.4', 14): (2200096997389, ((0, 13),)),
+        ('00:18:0a', '2.4', 15): (2200096997390, ((0, 14),)),
+        ('00:18:0a', '5', 1): (2200365432832, ()),
+        ('00:18:0a', '5', 2): (2200365432833, ((0, 1),)),
+        ('00:18:0a', '5', 3): (2200365432834, ((0, 2),)),
+        ('00:18:0a', '5', 4): (2200365432835, ((0, 3),)),
+        ('00:18:0a', '5', 5): (2200365432836, ((0, 4),)),
+        ('00:18:0a', '5', 6): (2200365432837, ((0, 5),)),
+        ('00:18:0a', '5', 7): (2200365432838, ((0, 6),)),
+        ('00:18:0a', '5', 8): (2200365432839, ((0, 7),)),
+        ('00:18:0a', '5', 9): (2200365432840, ((0, 8),)),
+        ('00:18:0a', '5', 10): (2200365432841, ((0, 9),)),
+        ('00:18:0a', '5', 11): (2200365432842, ((0, 10),)),
+        ('00:18:0a', '5', 12): (2200365432843, ((0, 11),)),
+        ('00:18:0a', '5', 13): (2200365432844, ((0, 12),)),
+        ('00:18:0a', '5', 14): (2200365432845, ((0, 13),)),
+        ('00:18:0a', '5', 15): (2200365432846, ((0, 14),)),
+        ('88:15:44', '2.4', 1): (2197949513728, ()),
+        ('88:15:44', '2.4', 2): (2197949513729, ((0, 1),)),
+        ('88:15:44', '2.4', 3): (2197949513730, ((0, 2),)),
+        ('88:15:44', '2.4', 4): (2197949513731, ((0, 3),)),
+        ('88:15:44', '2.4', 5): (2197949513732, ((0, 4),)),
+        ('88:15:44', '2.4', 6): (2197949513733, ((0, 5),)),
+        ('88:15:44', '2.4', 7): (2197949513734, ((0, 6),)),
+        ('88:15:44', '2.4', 8): (2197949513735, ((0, 7),)),
+        ('88:15:44', '2.4', 9): (2197949513736, ((0, 8),)),
+        ('88:15:44', '2.4', 10): (2197949513737, ((0, 9),)),
+        ('88:15:44', '2.4', 11): (2197949513738, ((0, 10),)),
+        ('88:15:44', '2.4', 12): (2197949513739, ((0, 11),)),
+        ('88:15:44', '2.4', 13): (2197949513740, ((0, 12),)),
+        ('88:15:44', '2.4', 14): (2197949513741, ((0, 13),)),
+        ('88:15:44', '2.4', 15): (2197949513742, ((0, 14),)),
+        ('88:15:44', '5', 1): (2198217949184, ()),
+        ('88:15:44', '5', 2): (2198217949185, ((0, 1),)),
+        ('88:15:44', '5', 3): (2198217949186, ((0, 2),)),
+        ('88:15:44', '5', 4): (2198217949187, ((0, 3),)),
+        ('88:15:44', '5', 5): (2198217949188, ((0, 4),)),
+        ('88:15:44', '5', 6): (2198217949189, ((0, 5),)),
+        ('88:15:44', '5', 7): (2198217949190, ((0, 6),)),
+        ('88:15:44', '5', 8): (2198217949191, ((0, 7),)),
+        ('88:15:44', '5', 9): (2198217949192, ((0, 8),)),
+        ('88:15:44', '5', 10): (2198217949193, ((0, 9),)),
+        ('88:15:44', '5', 11): (2198217949194, ((0, 10),)),
+        ('88:15:44', '5', 12): (2198217949195, ((0, 11),)),
+        ('88:15:44', '5', 13): (2198217949196, ((0, 12),)),
+        ('88:15:44', '5', 14): (2198217949197, ((0, 13),)),
+        ('88:15:44', '5', 15): (2198217949198, ((0, 14),)),
+        ('e0:55:3d', '2.4', 1): (2200096997376, ()),
+        ('e0:55:3d', '2.4', 2): (2200096997377, ((0, 1),)),
+        ('e0:55:3d', '2.4', 3): (2200096997378, ((0, 2),)),
+        ('e0:55:3d', '2.4', 4): (2200096997379, ((0, 3),)),
+        ('e0:55:3d', '2.4', 5): (2200096997380, ((0, 4),)),
+        ('e0:55:3d', '2.4', 6): (2200096997381, ((0, 5),)),
+        ('e0:55:3d', '2.4', 7): (2200096997382, ((0, 6),)),
+        ('e0:55:3d', '2.4', 8): (2200096997383, ((0, 7),)),
+        ('e0:55:3d', '2.4', 9): (2200096997384, ((0, 8),)),
+        ('e0:55:3d', '2.4', 10): (2200096997385, ((0, 9),)),
+        ('e0:55:3d', '2.4', 11): (2200096997386, ((0, 10),)),
+        ('e0:55:3d', '2.4', 12): (2200096997387, ((0, 11),)),
+        ('e0:55:3d', '2.4', 13): (2200096997388, ((0, 12),)),
+        ('e0:55:3d', '2.4', 14): (2200096997389, ((0, 13),)),
+        ('e0:55:3d', '2.4', 15): (2200096997390, ((0, 14),)),
+        ('e0:55:3d', '5', 1): (2199828561920, ()),
+        ('e0:55:3d', '5', 2): (2199828561921, ((0, 1),)),
+        ('e0:55:3d', '5', 3): (2199828561922, ((0, 2),)),
+        ('e0:55:3d', '5', 4): (2199828561923, ((0, 3),)),
+        ('e0:55:3d', '5', 5): (2199828561924, ((0, 4),)),
+        ('e0:55:3d', '5', 6): (2199828561925, ((0, 5),)),
+        ('e0:55:3d', '5', 7): (2199828561926, ((0, 6),)),
+        ('e0:55:3d', '5', 8): (2199828561927, ((0, 7),)),
+        ('e0:55:3d', '5', 9): (2199828561928, ((0, 8),)),
+        ('e0:55:3d', '5', 10): (2199828561929, ((0, 9),)),
+        ('e0:55:3d', '5', 11): (2199828561930, ((0, 10),)),
+        ('e0:55:3d', '5', 12): (2199828561931, ((0, 11),)),
+        ('e0:55:3d', '5', 13): (2199828561932, ((0, 12),)),
+        ('e0:55:3d', '5', 14): (2199828561933, ((0, 13),)),
+        ('e0:55:3d', '5', 15): (2199828561934, ((0, 14),)),
+        ('0c:8d:db', '2.4', 1): (2197681078272, ()),
+        ('0c:8d:db', '2.4', 2): (2197681078273, ((0, 1),)),
+        ('0c:8d:db', '2.4', 3): (2197681078274, ((0, 2),)),
+        ('0c:8d:db', '2.4', 4): (2197681078275, ((0, 3),)),
+        ('0c:8d:db', '2.4', 5): (2197681078276, ((0, 4),)),
+        ('0c:8d:db', '2.4', 6): (2197681078277, ((0, 5),)),
+        ('0c:8d:db', '2.4', 7): (2197681078278, ((0, 6),)),
+        ('0c:8d:db', '2.4', 8): (2197681078279, ((0, 7),)),
+        ('0c:8d:db', '2.4', 9): (2197681078280, ((0, 8),)),
+        ('0c:8d:db', '2.4', 10): (2197681078281, ((0, 9),)),
+        ('0c:8d:db', '2.4', 11): (2197681078282, ((0, 10),)),
+        ('0c:8d:db', '2.4', 12): (2197681078283, ((0, 11),)),
+        ('0c:8d:db', '2.4', 13): (2197681078284, ((0, 12),)),
+        ('0c:8d:db', '2.4', 14): (2197681078285, ((0, 13),)),
+        ('0c:8d:db', '2.4', 15): (2197681078286, ((0, 14),)),
+        ('0c:8d:db', '5', 1): (2197412642816, ()),
+        ('0c:8d:db', '5', 2): (2197412642817, ((0, 1),)),
+        ('0c:8d:db', '5', 3): (2197412642818, ((0, 2),)),
+        ('0c:8d:db', '5', 4): (2197412642819, ((0, 3),)),
+        ('0c:8d:db', '5', 5): (2197412642820, ((0, 4),)),
+        ('0c:8d:db', '5', 6): (2197412642821, ((0, 5),)),
+        ('0c:8d:db', '5', 7): (2197412642822, ((0, 6),)),
+        ('0c:8d:db', '5', 8): (2197412642823, ((0, 7),)),
+        ('0c:8d:db', '5', 9): (2197412642824, ((0, 8),)),
+        ('0c:8d:db', '5', 10): (2197412642825, ((0, 9),)),
+        ('0c:8d:db', '5', 11): (2197412642826, ((0, 10),)),
+        ('0c:8d:db', '5', 12): (2197412642827, ((0, 11),)),
+        ('0c:8d:db', '5', 13): (2197412642828, ((0, 12),)),
+        ('0c:8d:db', '5', 14): (2197412642829, ((0, 13),)),
+        ('0c:8d:db', '5', 15): (2197412642830, ((0, 14),)),
+    },
+    3: {
+        ('88:15:44', '2.4', 1): (0, ()),
+        ('88:15:44', '2.4', 2): (6597069766656, ()),
+        ('88:15:44', '2.4', 3): (-6597069766656, ()),
+        ('88:15:44', '2.4', 4): (-2199023255552, ()),
+        ('88:15:44', '2.4', 5): (19791209299968, ()),
+        ('88:15:44', '2.4', 6): (24189255811072, ()),
+        ('88:15:44', '2.4', 7): (10995116277760, ()),
+        ('88:15:44', '2.4', 8): (15393162788864, ()),
+        ('88:15:44', '2.4', 9): (37383395344384, ()),
+        ('88:15:44', '2.4', 10): (41781441855488, ()),
+        ('88:15:44', '2.4', 11): (28587302322176, ()),
+        ('88:15:44', '2.4', 12): (32985348833280, ()),
+        ('88:15:44', '2.4', 13): (54975581388800, ()),
+        ('88:15:44', '2.4', 14): (59373627899904, ()),
+        ('88:15:44', '2.4', 15): (46179488366592, ()),
+        ('88:15:44', '5', 1): (2199291691008, ()),
+        ('88:15:44', '5', 2): (6597338202112, ()),
+        ('88:15:44', '5', 3): (-6596801331200, ()),
+        ('88:15:44', '5', 4): (-2198754820096, ()),
+        ('88:15:44', '5', 5): (19791477735424, ()),
+        ('88:15:44', '5', 6): (24189524246528, ()),
+        ('88:15:44', '5', 7): (10995384713216, ()),
+        ('88:15:44', '5', 8): (15393431224320, ()),
+        ('88:15:44', '5', 9): (37383663779840, ()),
+        ('88:15:44', '5', 10): (41781710290944, ()),
+        ('88:15:44', '5', 11): (28587570757632, ()),
+        ('88:15:44', '5', 12): (32985617268736, ()),
+        ('88:15:44', '5', 13): (54975849824256, ()),
+        ('88:15:44', '5', 14): (59373896335360, ()),
+        ('88:15:44', '5', 15): (46179756802048, ()),
+        ('e0:55:3d', '2.4', 1): (0, ()),
+        ('e0:55:3d', '2.4', 2): (6597069766656, ()),
+        ('e0:55:3d', '2.4', 3): (10995116277760, ()),
+        ('e0:55:3d', '2.4', 4): (15393162788864, ()),
+        ('e0:55:3d', '2.4', 5): (19791209299968, ()),
+        ('e0:55:3d', '2.4', 6): (24189255811072, ()),
+        ('e0:55:3d', '2.4', 7): (28587302322176, ()),
+        ('e0:55:3d', '2.4', 8): (32985348833280, ()),
+        ('e0:55:3d', '2.4', 9): (-32985348833280, ()),
+        ('e0:55:3d', '2.4', 10): (-28587302322176, ()),
+        ('e0:55:3d', '2.4', 11): (-24189255811072, ()),
+        ('e0:55:3d', '2.4', 12): (-19791209299968, ()),
+        ('e0:55:3d', '2.4', 13): (-15393162788864, ()),
+        ('e0:55:3d', '2.4', 14): (-10995116277760, ()),
+        ('e0:55:3d', '2.4', 15): (-6597069766656, ()),
+        ('e0:55:3d', '5', 1): (2198754820096, ()),
+        ('e0:55:3d', '5', 2): (6596801331200, ()),
+        ('e0:55:3d', '5', 3): (10994847842304, ()),
+        ('e0:55:3d', '5', 4): (15392894353408, ()),
+        ('e0:55:3d', '5', 5): (19790940864512, ()),
+        ('e0:55:3d', '5', 6): (24188987375616, ()),
+        ('e0:55:3d', '5', 7): (28587033886720, ()),
+        ('e0:55:3d', '5', 8): (32985080397824, ()),
+        ('e0:55:3d', '5', 9): (-32985617268736, ()),
+        ('e0:55:3d', '5', 10): (-28587570757632, ()),
+        ('e0:55:3d', '5', 11): (-24189524246528, ()),
+        ('e0:55:3d', '5', 12): (-19791477735424, ()),
+        ('e0:55:3d', '5', 13): (-15393431224320, ()),
+        ('e0:55:3d', '5', 14): (-10995384713216, ()),
+        ('e0:55:3d', '5', 15): (-6597338202112, ()),
+        ('0c:8d:db', '2.4', 1): (0, ()),
+        ('0c:8d:db', '2.4', 2): (-2199023255552, ()),
+        ('0c:8d:db', '2.4', 3): (-6597069766656, ()),
+        ('0c:8d:db', '2.4', 4): (-10995116277760, ()),
+        ('0c:8d:db', '2.4', 5): (19791209299968, ()),
+        ('0c:8d:db', '2.4', 6): (15393162788864, ()),
+        ('0c:8d:db', '2.4', 7): (10995116277760, ()),
+        ('0c:8d:db', '2.4', 8): (6597069766656, ()),
+        ('0c:8d:db', '2.4', 9): (37383395344384, ()),
+        ('0c:8d:db', '2.4', 10): (32985348833280, ()),
+        ('0c:8d:db', '2.4', 11): (28587302322176, ()),
+        ('0c:8d:db', '2.4', 12): (24189255811072, ()),
+        ('0c:8d:db', '2.4', 13): (54975581388800, ()),
+        ('0c:8d:db', '2.4', 14): (50577534877696, ()),
+        ('0c:8d:db', '2.4', 15): (46179488366592, ()),
+        ('0c:8d:db', '5', 1): (2198754820096, ()),
+        ('0c:8d:db', '5', 2): (-2199291691008, ()),
+        ('0c:8d:db', '5', 3): (-6597338202112, ()),
+        ('0c:8d:db', '5', 4): (-10995384713216, ()),
+        ('0c:8d:db', '5', 5): (19790940864512, ()),
+        ('0c:8d:db', '5', 6): (15392894353408, ()),
+        ('0c:8d:db', '5', 7): (10994847842304, ()),
+        ('0c:8d:db', '5', 8): (6596801331200, ()),
+        ('0c:8d:db', '5', 9): (37383126908928, ()),
+        ('0c:8d:db', '5', 10): (32985080397824, ()),
+        ('0c:8d:db', '5', 11): (28587033886720, ()),
+        ('0c:8d:db', '5', 12): (24188987375616, ()),
+        ('0c:8d:db', '5', 13): (54975312953344, ()),
+        ('0c:8d:db', '5', 14): (50577266442240, ()),
+        ('0c:8d:db', '5', 15): (46179219931136, ()),
+    },
+}
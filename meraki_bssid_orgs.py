@@ -0,0 +1,136 @@
+# Exports bssids for many organizations at once, spread over a pool of worker processes.
+#
+#   report = export_many_orgs('your-api-key-here',['org-1','org-2','org-3'],processes=4)
+#
+# writes one csv per org, named by filename_pattern (bssids-<org id>.csv by default), or
+# into one merged csv with the org id as its first column:
+#   export_many_orgs('your-api-key-here',org_ids,filename_pattern=None,merged_filename='bssids.csv')
+#
+# or from the command line:
+#   python meraki_bssid_orgs.py org-1 org-2 org-3 --processes 4 --merged bssids.csv
+#
+# Each process exports one org at a time with its own MerakiBssidGetter and DashboardClient,
+# which keeps to rate_limit requests per second (the dashboard limits each org separately).
+# processes caps how many orgs are exported at once, so at most processes * rate_limit
+# requests per second go out in total; workers sets the getter's ssid lookup threads within
+# each process.
+#
+# An org that fails is reported and the rest carry on.  The report lists the file written
+# for each exported org and the error for each failed one:
+#   {'exported': {'org-1': 'bssids-org-1.csv', ...}, 'failed': {'org-2': 'HTTPError: ...'}}
+#
+# Per org files are written under a temporary name and renamed once complete, so a failed
+# org leaves no partial file behind.  The merged file keeps the order of org_ids.  An org
+# listed more than once is exported once, where it's first listed.
+
+from meraki_bssid_getter import MerakiBssidGetter, csv_header
+from meraki_bssid_parallel import imap_ordered
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+merged_csv_header = ['Organization id'] + csv_header
+
+logger = logging.getLogger(__name__)
+
+
+def export_org(job):
+    api_key,org_id,filename,options = job
+    try:
+        from meraki_dashboard_client import DashboardClient
+        bssid_getter = MerakiBssidGetter(
+            api_key,
+            workers=options['workers'],
+            rate_limit=options['rate_limit'],
+            base_url=options['base_url'] or DashboardClient.base_url
+        )
+        bssid_getter.export_org_bssids_to_csv(org_id,filename + '.tmp')
+        os.replace(filename + '.tmp',filename)
+        return (org_id,filename,None)
+    except Exception as error:
+        try:
+            os.remove(filename + '.tmp')
+        except OSError:
+            pass
+        return (org_id,None,type(error).__name__ + ': ' + str(error))
+
+
+def export_many_orgs(api_key,org_ids,filename_pattern='bssids-{org_id}.csv',merged_filename=None,processes=4,workers=1,rate_limit=5,base_url=None):
+    if (filename_pattern is None) and (merged_filename is None):
+        raise ValueError('filename_pattern or merged_filename is needed')
+    options = {'workers': workers, 'rate_limit': rate_limit, 'base_url': base_url}
+    # two jobs for one org would write (and rename) the same temporary file at the same time
+    org_ids = list(dict.fromkeys(org_ids))
+    report = {'exported': {}, 'failed': {}}
+    scratch_directory = None
+    if (filename_pattern is None):
+        scratch_directory = tempfile.mkdtemp(prefix='bssids-',dir=os.path.dirname(os.path.abspath(merged_filename)))
+        filename_pattern = os.path.join(scratch_directory,'{org_id}.csv')
+    jobs = ((api_key,org_id,filename_pattern.format(org_id=org_id),options) for org_id in org_ids)
+    executor = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+    mergedfile = None
+    try:
+        if (merged_filename is not None):
+            mergedfile = open(merged_filename + '.tmp','w')
+            merged_writer = csv.writer(mergedfile,lineterminator='\n')
+            merged_writer.writerow(merged_csv_header)
+        for org_id,filename,error in imap_ordered(executor,export_org,jobs,window=processes*4):
+            if (error is not None):
+                logger.warning('Export failed for org %s: %s',org_id,error)
+                report['failed'][org_id] = error
+                continue
+            logger.info('Exported org %s',org_id)
+            if (mergedfile is not None):
+                with open(filename,newline='') as orgfile:
+                    rows = csv.reader(orgfile)
+                    next(rows,None)
+                    merged_writer.writerows([org_id] + row for row in rows)
+            report['exported'][org_id] = filename if scratch_directory is None else None
+    finally:
+        if (executor is not None):
+            executor.shutdown()
+        if (mergedfile is not None):
+            mergedfile.close()
+        if (scratch_directory is not None):
+            shutil.rmtree(scratch_directory,ignore_errors=True)
+    if (merged_filename is not None):
+        os.replace(merged_filename + '.tmp',merged_filename)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export Meraki bssids for many organizations.')
+    parser.add_argument('org_ids',nargs='+',help='organization ids')
+    parser.add_argument('--api-key',default=os.environ.get('MERAKI_DASHBOARD_API_KEY'),help='dashboard api key (default $MERAKI_DASHBOARD_API_KEY)')
+    parser.add_argument('--filename-pattern',default='bssids-{org_id}.csv',help='per org csv filename (default bssids-{org_id}.csv)')
+    parser.add_argument('--merged',default=None,help='write every org into this csv instead of one csv per org')
+    parser.add_argument('--processes',type=int,default=4,help='orgs exported at once (default 4)')
+    parser.add_argument('--workers',type=int,default=1,help='ssid lookup threads per process (default 1)')
+    parser.add_argument('--rate-limit',type=float,default=5,help='dashboard requests per second per process (default 5)')
+    parser.add_argument('--base-url',default=None,help='dashboard api base url')
+    args = parser.parse_args(argv)
+    if (args.api_key is None):
+        parser.error('an api key is needed, pass --api-key or set MERAKI_DASHBOARD_API_KEY')
+    logging.basicConfig(level=logging.INFO,format='%(message)s')
+    report = export_many_orgs(
+        args.api_key,
+        args.org_ids,
+        filename_pattern=None if args.merged is not None else args.filename_pattern,
+        merged_filename=args.merged,
+        processes=max(args.processes,1),
+        workers=max(args.workers,1),
+        rate_limit=args.rate_limit,
+        base_url=args.base_url
+    )
+    for org_id,error in report['failed'].items():
+        sys.stderr.write('org ' + str(org_id) + ' failed: ' + error + '\n')
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+# Helpers for spreading bssid work over a pool of workers.
+#
+# imap_ordered is executor.map with a bounded window: at most `window` items are submitted
+# ahead of the one being returned, so long inputs stream through a pool with bounded memory
+# and results still come back in input order.  With no executor it's a plain map:
+#   with ProcessPoolExecutor(max_workers=4) as executor:
+#       for result in imap_ordered(executor,calculate_chunk,chunks,window=8):
+#           ...
+
+from collections import deque
+
+
+def imap_ordered(executor,function,iterable,window):
+    if (executor is None):
+        for item in iterable:
+            yield function(item)
+        return
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(function,item))
+        if (len(pending) >= window):
+            yield pending.popleft().result()
+    while (len(pending) > 0):
+        yield pending.popleft().result()
@@ -0,0 +1,183 @@
+# Joins wireless scan logs against the bssids an org's access points broadcast.
+#
+# Reads a csv (with a header row) or json lines file of observed bssids, e.g. from a site
+# survey or sensors, and tags each row with the ap that owns the bssid:
+#   python meraki_bssid_scans.py scans.csv --inventory inventory.json -o enriched.csv --unknown unknown.csv
+#   python meraki_bssid_scans.py scans.jsonl --inventory inventory.json -o enriched.jsonl --workers 8
+#
+# inventory.json is the org inventory as returned by meraki.getorginventory; every bssid its
+# access points can emit is precomputed into a BssidIndex.  Rows need a bssid column (any
+# case) or key; anything else, like rssi and timestamp, is passed through as is, and so is
+# the csv header.  Matched rows get ap_mac, model, ssid_number (the calculator's 1-15), band
+# and network_id added.  Rows whose bssid isn't one of the org's go to the --unknown file
+# unchanged: neighbours, or rogue aps.
+#
+# Or from python:
+#   with open('scans.csv') as infile, open('enriched.csv','w') as outfile:
+#       summary = join_scans(infile,outfile,inventory,workers=8)
+#
+# The input is read in chunks of raw lines and each chunk is parsed, joined and formatted on
+# a pool of worker processes, each with its own copy of the index.  At most a couple of
+# chunks per worker are in flight and output is written in input order, so memory stays
+# bounded whatever the size of the log.  The same bssids turn up over and over in a scan
+# log, so each distinct bssid is only looked up once per chunk.  Since chunks are split on
+# lines, csv fields can't contain line breaks.  Lines that can't be parsed are counted as
+# invalid and skipped.
+
+from meraki_bssid_index import BssidIndex
+from meraki_bssid_parallel import imap_ordered
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+
+match_fields = ['ap_mac','model','ssid_number','band','network_id']
+
+worker_index = None
+
+
+def load_worker_index(inventory):
+    global worker_index
+    worker_index = BssidIndex(inventory)
+
+
+def read_line_chunks(infile,chunk_size):
+    while True:
+        chunk = list(itertools.islice(infile,chunk_size))
+        if (len(chunk) == 0):
+            return
+        yield chunk
+
+
+def normalize_bssid(bssid):
+    return bssid.strip().lower().replace('-',':')
+
+
+def join_chunk(job):
+    input_format,bssid_column,lines = job
+    matched = io.StringIO()
+    unknown = io.StringIO()
+    counts = {'rows': 0, 'matched': 0, 'unknown': 0, 'invalid': 0}
+    if (input_format == 'jsonl'):
+        rows,bssids = parse_jsonl(lines,counts)
+    else:
+        rows,bssids = parse_csv(bssid_column,lines,counts)
+    distinct = list(dict.fromkeys(bssids))
+    found = dict(zip(distinct,worker_index.lookup_many([normalize_bssid(bssid) for bssid in distinct])))
+    matches = [found[bssid] for bssid in bssids]
+    if (input_format == 'jsonl'):
+        for (line,row),match in zip(rows,matches):
+            if (match is None):
+                unknown.write(line if line.endswith('\n') else line + '\n')
+            else:
+                row.update(match._asdict())
+                matched.write(json.dumps(row) + '\n')
+    else:
+        matched_writer = csv.writer(matched,lineterminator='\n')
+        unknown_writer = csv.writer(unknown,lineterminator='\n')
+        for row,match in zip(rows,matches):
+            if (match is None):
+                unknown_writer.writerow(row)
+            else:
+                matched_writer.writerow(row + list(match))
+    counts['rows'] = len(rows)
+    counts['unknown'] = matches.count(None)
+    counts['matched'] = len(rows) - counts['unknown']
+    return (matched.getvalue(),unknown.getvalue(),counts)
+
+
+def parse_jsonl(lines,counts):
+    rows = []
+    bssids = []
+    for line in lines:
+        if (line.strip() == ''):
+            continue
+        try:
+            row = json.loads(line)
+            bssid = row['bssid']
+        except (ValueError,KeyError,TypeError):
+            counts['invalid'] += 1
+            continue
+        rows.append((line,row))
+        bssids.append(bssid if isinstance(bssid,str) else '')
+    return (rows,bssids)
+
+
+def parse_csv(bssid_column,lines,counts):
+    rows = []
+    bssids = []
+    for row in csv.reader(lines):
+        if (len(row) == 0):
+            continue
+        if (len(row) <= bssid_column):
+            counts['invalid'] += 1
+            continue
+        rows.append(row)
+        bssids.append(row[bssid_column])
+    return (rows,bssids)
+
+
+def join_scans(infile,outfile,inventory,unknownfile=None,input_format='csv',workers=1,chunk_size=50000):
+    summary = {'rows': 0, 'matched': 0, 'unknown': 0, 'invalid': 0}
+    bssid_column = None
+    if (input_format == 'csv'):
+        header = next(csv.reader([infile.readline()]),[])
+        columns = [column.strip().lower() for column in header]
+        if ('bssid' not in columns):
+            raise ValueError('the csv header needs a bssid column')
+        bssid_column = columns.index('bssid')
+        csv.writer(outfile,lineterminator='\n').writerow(header + match_fields)
+        if (unknownfile is not None):
+            csv.writer(unknownfile,lineterminator='\n').writerow(header)
+    jobs = ((input_format,bssid_column,lines) for lines in read_line_chunks(infile,chunk_size))
+    executor = None
+    if (workers > 1):
+        executor = ProcessPoolExecutor(max_workers=workers,initializer=load_worker_index,initargs=(inventory,))
+    else:
+        load_worker_index(inventory)
+    try:
+        for matched,unknown,counts in imap_ordered(executor,join_chunk,jobs,window=workers*2):
+            outfile.write(matched)
+            if (unknownfile is not None):
+                unknownfile.write(unknown)
+            for key,count in counts.items():
+                summary[key] += count
+    finally:
+        if (executor is not None):
+            executor.shutdown()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tag scanned bssids with the Meraki ap and ssid that broadcasts them.')
+    parser.add_argument('input',nargs='?',default='-',help='scan log, - for stdin (default)')
+    parser.add_argument('--inventory',required=True,help='org inventory json (meraki.getorginventory output)')
+    parser.add_argument('-o','--output',default='-',help='output for matched rows, - for stdout (default)')
+    parser.add_argument('--unknown',default=None,help='output for rows that matched no ap')
+    parser.add_argument('--format',choices=['csv','jsonl'],default=None,help='input and output format (default from the input file name, else csv)')
+    parser.add_argument('--workers',type=int,default=1,help='worker processes (default 1, no pool)')
+    parser.add_argument('--chunk-size',type=int,default=50000,help='input lines per chunk (default 50000)')
+    args = parser.parse_args(argv)
+    input_format = args.format
+    if (input_format is None):
+        input_format = 'jsonl' if args.input.endswith(('.jsonl','.ndjson')) else 'csv'
+    with open(args.inventory) as inventoryfile:
+        inventory = json.load(inventoryfile)
+    infile = sys.stdin if args.input == '-' else open(args.input,newline='')
+    outfile = sys.stdout if args.output == '-' else open(args.output,'w',newline='')
+    unknownfile = open(args.unknown,'w',newline='') if args.unknown is not None else None
+    try:
+        summary = join_scans(infile,outfile,inventory,unknownfile,input_format,max(args.workers,1),max(args.chunk_size,1))
+    finally:
+        for openfile in (infile,outfile,unknownfile):
+            if (openfile is not None) and (openfile not in (sys.stdin,sys.stdout)):
+                openfile.close()
+    sys.stderr.write(json.dumps(summary) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+# A small local http service that answers "which ap and ssid owns this bssid".
+#
+# The index is built from one of:
+#   --inventory inventory.json   the json list meraki.getorginventory returns (BssidIndex)
+#   --table bssids.table         a bssid table written by the exporter (BssidTableReader)
+#   --csv bssids.csv             a csv written by export_org_bssids_to_csv
+#
+#   python meraki_bssid_service.py --table bssids.table --port 8080
+#
+# Endpoints:
+#   GET  /lookup?bssid=22:8d:db:00:00:00      {"bssid": "...", "match": {...} or null}
+#   POST /lookup  {"bssids": ["...", ...]}     {"matches": [{...} or null, ...]}
+#   POST /reload                               rebuilds the index from its source
+#   GET  /health                               source, entry count and load time
+#
+# Matches are the index's match tuples as json objects: ap_mac, model, ssid_number, band and
+# network_id for an inventory, or network, ssid, ap_mac and band for a table or csv.
+#
+# A reload (POST /reload, SIGHUP, or --refresh-interval seconds after the source file
+# changes) builds the new index next to the old one and then swaps it in with a single
+# assignment.  Requests already running keep the index they started with, so nothing is
+# dropped or answered from a half built index.
+
+from meraki_bssid_index import BssidIndex
+from meraki_bssid_table import BssidTableReader, write_bssid_table
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import argparse
+import csv
+import json
+import logging
+import os
+import signal
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def load_inventory_index(filename):
+    with open(filename) as inventoryfile:
+        return BssidIndex(json.load(inventoryfile))
+
+
+def load_table_index(filename):
+    return BssidTableReader(filename)
+
+
+def load_csv_index(filename):
+    descriptor,table_filename = tempfile.mkstemp(suffix='.table')
+    os.close(descriptor)
+    try:
+        with open(filename,newline='') as csvfile:
+            rows = csv.reader(csvfile)
+            next(rows,None)
+            write_bssid_table(rows,table_filename)
+        return BssidTableReader(table_filename)
+    finally:
+        # the reader keeps its mapping after the file is gone
+        try:
+            os.remove(table_filename)
+        except OSError:
+            pass
+
+
+class BssidLookupService:
+    def __init__(self,loader,source):
+        self.loader = loader
+        self.source = source
+        self.reload_lock = threading.Lock()
+        self.index = None
+        self.loaded_at = None
+        self.source_mtime = None
+        self.reload()
+
+    def reload(self):
+        with self.reload_lock:
+            started = time.time()
+            source_mtime = os.path.getmtime(self.source)
+            index = self.loader(self.source)
+            self.index = index
+            self.loaded_at = time.time()
+            self.source_mtime = source_mtime
+            logger.info('Loaded %d bssids from %s in %.3fs',len(index),self.source,self.loaded_at - started)
+
+    def reload_if_changed(self):
+        if (os.path.getmtime(self.source) != self.source_mtime):
+            self.reload()
+
+    def lookup(self,bssid):
+        return self.__as_dict(self.index.lookup(bssid))
+
+    def lookup_many(self,bssids):
+        return [self.__as_dict(match) for match in self.index.lookup_many(bssids)]
+
+    def health(self):
+        index = self.index
+        return {'source': self.source, 'entries': len(index), 'loaded_at': self.loaded_at}
+
+    def __as_dict(self,match):
+        if (match is None):
+            return None
+        return dict(match._asdict())
+
+
+class BssidLookupHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body go out as separate writes; without this keep-alive clients wait on
+    # delayed acks for every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if (url.path == '/lookup'):
+            bssid = parse_qs(url.query).get('bssid',[''])[0]
+            self.__respond(200,{'bssid': bssid, 'match': self.server.service.lookup(bssid)})
+        elif (url.path == '/health'):
+            self.__respond(200,self.server.service.health())
+        else:
+            self.__respond(404,{'error': 'not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length',0))
+        body = self.rfile.read(length) if length > 0 else b''
+        if (url.path == '/lookup'):
+            try:
+                bssids = json.loads(body.decode('utf-8'))['bssids']
+            except (ValueError,KeyError,TypeError):
+                bssids = None
+            if not isinstance(bssids,list) or not all(isinstance(bssid,str) for bssid in bssids):
+                self.__respond(400,{'error': 'expected {"bssids": ["...", ...]}'})
+                return
+            self.__respond(200,{'matches': self.server.service.lookup_many(bssids)})
+        elif (url.path == '/reload'):
+            try:
+                self.server.service.reload()
+            except Exception as error:
+                logger.exception('Reload failed')
+                self.__respond(500,{'error': str(error)})
+                return
+            self.__respond(200,self.server.service.health())
+        else:
+            self.__respond(404,{'error': 'not found'})
+
+    def log_message(self,format,*args):
+        logger.debug(format,*args)
+
+    def __respond(self,status,payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service,host='127.0.0.1',port=8080):
+    server = ThreadingHTTPServer((host,port),BssidLookupHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def watch_source(service,interval,stopped):
+    while not stopped.wait(interval):
+        try:
+            service.reload_if_changed()
+        except Exception:
+            logger.exception('Reload failed, keeping the current index')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve Meraki bssid lookups over http.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--inventory',help='org inventory json (meraki.getorginventory output)')
+    source.add_argument('--table',help='bssid table written by the exporter')
+    source.add_argument('--csv',help='csv written by export_org_bssids_to_csv')
+    parser.add_argument('--host',default='127.0.0.1',help='address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port',type=int,default=8080,help='port to listen on (default 8080)')
+    parser.add_argument('--refresh-interval',type=float,default=None,help='seconds between checks for a changed source file')
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO,format='%(asctime)s %(message)s')
+
+    if (args.inventory is not None):
+        service = BssidLookupService(load_inventory_index,args.inventory)
+    elif (args.table is not None):
+        service = BssidLookupService(load_table_index,args.table)
+    else:
+        service = BssidLookupService(load_csv_index,args.csv)
+    server = make_server(service,args.host,args.port)
+
+    stopped = threading.Event()
+    if (args.refresh_interval is not None):
+        threading.Thread(target=watch_source,args=(service,args.refresh_interval,stopped),daemon=True).start()
+    if hasattr(signal,'SIGHUP'):
+        signal.signal(signal.SIGHUP,lambda signum,frame: threading.Thread(target=service.reload,daemon=True).start())
+
+    logger.info('Serving bssid lookups on %s:%d',args.host,args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Exports bssids into a sqlite database, so they can be queried by bssid, ap or network
+# instead of scanning a csv.
+#
+#   bssid_getter.export_org_bssids_to_sqlite('org-id-here','bssids.sqlite')
+#
+# Every org shares one table, with a row per ap, ssid and band:
+#   bssids(org_id, network_id, network_name, ssid_number, ssid_name, ap_mac, band, bssid, generation)
+#
+# ssid_number is the dashboard's ssid number (0-14), as on Bssid.  The primary key is
+# (org_id, network_id, ssid_number, ap_mac, band), and bssid and ap_mac have indexes of their
+# own, so these are all index lookups:
+#   SELECT * FROM bssids WHERE bssid = '22:8d:db:00:00:00'
+#   SELECT * FROM bssids WHERE ap_mac = '0c:8d:db:00:00:00'
+#   SELECT * FROM bssids WHERE org_id = 'org-id-here' AND network_id = 'N_1234'
+#
+# Rows are written with executemany in batches of batch_size, a transaction per batch, into
+# a temporary staging table on the writer's own connection.  That doesn't lock the database,
+# so exports of several orgs can run side by side while they wait on the dashboard.  close()
+# then moves them into bssids in one short transaction, so readers see either the previous
+# export of an org or the new one.  Exporting an org again upserts its rows and then deletes the ones the new
+# export didn't write (aps or ssids that have gone away); other orgs' rows aren't touched.
+#
+# When the load is bigger than what's already in the table (the first export into a new
+# database, say) the bssid and ap_mac indexes are dropped and rebuilt around it, which is
+# much faster than updating them row by row.  Otherwise they're kept and updated in place,
+# so exporting org after org into one database doesn't rebuild them over every org each time.
+
+import sqlite3
+
+schema = (
+    'CREATE TABLE IF NOT EXISTS bssids ('
+    'org_id TEXT NOT NULL, network_id TEXT NOT NULL, network_name TEXT NOT NULL, '
+    'ssid_number INTEGER NOT NULL, ssid_name TEXT NOT NULL, ap_mac TEXT NOT NULL, '
+    'band TEXT NOT NULL, bssid TEXT NOT NULL, generation INTEGER NOT NULL, '
+    'PRIMARY KEY (org_id,network_id,ssid_number,ap_mac,band)) WITHOUT ROWID'
+)
+indexes = {
+    'bssids_bssid': 'CREATE INDEX IF NOT EXISTS bssids_bssid ON bssids (bssid)',
+    'bssids_ap_mac': 'CREATE INDEX IF NOT EXISTS bssids_ap_mac ON bssids (ap_mac)'
+}
+staging = (
+    'CREATE TEMP TABLE IF NOT EXISTS bssids_staging ('
+    'network_id TEXT, network_name TEXT, ssid_number INTEGER, ssid_name TEXT, '
+    'ap_mac TEXT, band TEXT, bssid TEXT)'
+)
+stage = 'INSERT INTO bssids_staging VALUES (?,?,?,?,?,?,?)'
+# "WHERE true" is how sqlite tells an upsert's ON CONFLICT apart from a join in INSERT ... SELECT
+upsert = (
+    'INSERT INTO bssids (org_id,network_id,network_name,ssid_number,ssid_name,ap_mac,band,bssid,generation) '
+    'SELECT ?,network_id,network_name,ssid_number,ssid_name,ap_mac,band,bssid,? FROM bssids_staging WHERE true '
+    'ON CONFLICT (org_id,network_id,ssid_number,ap_mac,band) DO UPDATE SET '
+    'network_name = excluded.network_name, ssid_name = excluded.ssid_name, '
+    'bssid = excluded.bssid, generation = excluded.generation'
+)
+
+
+class BssidDatabaseWriter:
+    def __init__(self,filename,org_id,batch_size=10000):
+        self.filename = filename
+        self.org_id = str(org_id)
+        self.batch_size = batch_size
+        self.batch = []
+        self.rows = 0
+        self.generation = None
+        self.connection = sqlite3.connect(filename,isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(schema)
+        self.connection.execute(staging)
+
+    def add_bssid(self,network,bssid):
+        for band,value in (('2.4',bssid.bssid_24),('5',bssid.bssid_5)):
+            self.add(network['id'],network['name'],bssid.ssid_number,bssid.ssid,bssid.ap,band,value)
+
+    def add(self,network_id,network_name,ssid_number,ssid_name,ap_mac,band,bssid):
+        if isinstance(bssid,int):
+            bssid = bssid.to_bytes(6,'big').hex(':')
+        self.batch.append((network_id,network_name,ssid_number,ssid_name,ap_mac,band,bssid))
+        if (len(self.batch) >= self.batch_size):
+            self.__flush()
+
+    def close(self):
+        try:
+            self.__flush()
+            self.connection.execute('BEGIN IMMEDIATE')
+            generation, = self.connection.execute(
+                'SELECT COALESCE(MAX(generation),0) + 1 FROM bssids WHERE org_id = ?',
+                (self.org_id,)
+            ).fetchone()
+            # only counts as far as the load, so this stays cheap however big the table gets
+            existing, = self.connection.execute(
+                'SELECT COUNT(*) FROM (SELECT 1 FROM bssids LIMIT ?)',
+                (self.rows,)
+            ).fetchone()
+            rebuild_indexes = (existing < self.rows)
+            if rebuild_indexes:
+                for index in indexes:
+                    self.connection.execute('DROP INDEX IF EXISTS ' + index)
+            self.connection.execute(upsert,(self.org_id,generation))
+            self.connection.execute('DELETE FROM bssids WHERE org_id = ? AND generation < ?',(self.org_id,generation))
+            for index in indexes.values():
+                self.connection.execute(index)
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.abort()
+            raise
+        self.generation = generation
+        # the statistics only need refreshing when the load changed the table's size a lot
+        if rebuild_indexes:
+            self.connection.execute('ANALYZE bssids')
+        self.connection.close()
+        return self.rows
+
+    def abort(self):
+        if self.connection.in_transaction:
+            self.connection.execute('ROLLBACK')
+        self.connection.close()
+
+    def __flush(self):
+        if (len(self.batch) > 0):
+            # one transaction per batch rather than one per row; it only touches the temporary
+            # table, so it doesn't take the database's write lock
+            self.connection.execute('BEGIN')
+            self.connection.executemany(stage,self.batch)
+            self.connection.execute('COMMIT')
+            self.rows += len(self.batch)
+            self.batch = []
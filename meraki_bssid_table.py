@@ -0,0 +1,177 @@
+# A fixed width binary bssid table that can be memory mapped and shared between processes.
+#
+# The exporter can write one next to the csv:
+#   bssid_getter.export_org_bssids_to_csv('org-id-here','bssids.csv',table_filename='bssids.table')
+#
+# or write one from any rows shaped like the csv (network, ssid, ap mac, 2.4 bssid, 5 bssid):
+#   write_bssid_table(rows,'bssids.table')
+#
+# Readers map the file and binary search it in place, so every process on a host shares the
+# same page cached copy and opening it doesn't parse anything:
+#   table = BssidTableReader('bssids.table')
+#   table.lookup('22:8d:db:00:00:00')
+#   -> BssidTableMatch(network='Branch 12', ssid='Corp', ap_mac='0c:8d:db:00:00:00', band='2.4')
+#
+# Layout (all integers little endian):
+#   header   magic 'MBSSIDT1', version u32, record size u32, record count u64,
+#            records offset u64, strings offset u64
+#   records  sorted by bssid; 6 byte big endian bssid, then u32 offsets of the network,
+#            ssid and ap mac strings and a u8 band (0 = 2.4, 1 = 5), padded to record size
+#   strings  each string once, as a u16 length followed by utf-8 bytes
+#
+# Bssids that aren't plain 6 octet macs are left out, since they can't be seen over the air.
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+from array import array
+from collections import namedtuple
+import mmap
+import os
+import struct
+
+BssidTableMatch = namedtuple('BssidTableMatch',['network','ssid','ap_mac','band'])
+
+table_magic = b'MBSSIDT1'
+table_version = 1
+header_format = struct.Struct('<8sIIQQQ')
+record_format = struct.Struct('<6sIIIBx')
+string_length_format = struct.Struct('<H')
+
+
+class BssidTableWriter:
+    def __init__(self,filename):
+        self.filename = filename
+        self.strings = {}
+        self.string_table = bytearray()
+        self.bssids = array('Q')
+        self.networks = array('I')
+        self.ssids = array('I')
+        self.aps = array('I')
+        self.bands = array('B')
+
+    def add_row(self,row):
+        network,ssid,ap_mac,bssid_24,bssid_5 = row[:5]
+        for band,bssid in enumerate((bssid_24,bssid_5)):
+            self.add(network,ssid,ap_mac,MerakiBssidCalculator.bands[band],bssid)
+
+    def add(self,network,ssid,ap_mac,band,bssid):
+        bssid_value = MerakiBssidCalculator.mac_value(bssid.lower())
+        if (bssid_value is None):
+            return
+        self.bssids.append(bssid_value)
+        self.networks.append(self.__string_offset(network))
+        self.ssids.append(self.__string_offset(ssid))
+        self.aps.append(self.__string_offset(ap_mac))
+        self.bands.append(MerakiBssidCalculator.bands.index(band))
+
+    def close(self):
+        order = sorted(range(len(self.bssids)),key=self.bssids.__getitem__)
+        records_offset = header_format.size
+        strings_offset = records_offset + len(order) * record_format.size
+        with open(self.filename + '.tmp','wb') as tablefile:
+            tablefile.write(header_format.pack(table_magic,table_version,record_format.size,len(order),records_offset,strings_offset))
+            for i in order:
+                tablefile.write(record_format.pack(
+                    self.bssids[i].to_bytes(6,'big'),
+                    self.networks[i],
+                    self.ssids[i],
+                    self.aps[i],
+                    self.bands[i]
+                ))
+            tablefile.write(self.string_table)
+        # replace rather than rewrite, so readers that already mapped the old table keep working
+        os.replace(self.filename + '.tmp',self.filename)
+
+    def __string_offset(self,value):
+        offset = self.strings.get(value)
+        if (offset is None):
+            encoded = value.encode('utf-8')
+            offset = len(self.string_table)
+            self.string_table += string_length_format.pack(len(encoded))
+            self.string_table += encoded
+            self.strings[value] = offset
+        return offset
+
+
+def write_bssid_table(rows,filename):
+    writer = BssidTableWriter(filename)
+    for row in rows:
+        writer.add_row(row)
+    writer.close()
+
+
+class BssidTableReader:
+    def __init__(self,filename):
+        with open(filename,'rb') as tablefile:
+            self.map = mmap.mmap(tablefile.fileno(),0,access=mmap.ACCESS_READ)
+        magic,version,record_size,count,records_offset,strings_offset = header_format.unpack_from(self.map,0)
+        if (magic != table_magic) or (version != table_version):
+            raise ValueError(filename + ' is not a version ' + str(table_version) + ' bssid table')
+        self.record_size = record_size
+        self.count = count
+        self.records_offset = records_offset
+        self.strings_offset = strings_offset
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self,bssid):
+        position = self.__find(bssid)
+        if (position is None):
+            return None
+        return self.__match(position)
+
+    def lookup_all(self,bssid):
+        matches = []
+        position = self.__find(bssid)
+        if (position is None):
+            return matches
+        key = self.__key(position)
+        while (position < self.count) and (self.__key(position) == key):
+            matches.append(self.__match(position))
+            position += 1
+        return matches
+
+    def lookup_many(self,bssids):
+        return [self.lookup(bssid) for bssid in bssids]
+
+    def close(self):
+        self.map.close()
+
+    def __find(self,bssid):
+        if isinstance(bssid,int):
+            bssid_value = bssid
+        else:
+            bssid_value = MerakiBssidCalculator.mac_value(bssid.lower())
+        if (bssid_value is None) or not (0 <= bssid_value <= 0xffffffffffff):
+            return None
+        key = bssid_value.to_bytes(6,'big')
+        low = 0
+        high = self.count
+        while (low < high):
+            middle = (low + high) // 2
+            if (self.__key(middle) < key):
+                low = middle + 1
+            else:
+                high = middle
+        if (low < self.count) and (self.__key(low) == key):
+            return low
+        return None
+
+    def __key(self,position):
+        offset = self.records_offset + position * self.record_size
+        return self.map[offset:offset+6]
+
+    def __match(self,position):
+        bssid,network,ssid,ap_mac,band = record_format.unpack_from(self.map,self.records_offset + position * self.record_size)
+        return BssidTableMatch(
+            network=self.__string(network),
+            ssid=self.__string(ssid),
+            ap_mac=self.__string(ap_mac),
+            band=MerakiBssidCalculator.bands[band]
+        )
+
+    def __string(self,offset):
+        offset += self.strings_offset
+        length, = string_length_format.unpack_from(self.map,offset)
+        offset += string_length_format.size
+        return self.map[offset:offset+length].decode('utf-8')
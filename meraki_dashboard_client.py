@@ -0,0 +1,91 @@
+# DashboardClient is a small dashboard api client for the calls MerakiBssidGetter makes.
+#
+# It's used by the getter's concurrent mode, where many requests are in flight at once:
+#   - one requests session (and connection pool) is shared by every worker thread
+#   - requests are paced by a token bucket so the org's dashboard rate limit is respected
+#   - a 429 response is retried after the Retry-After the dashboard sends back, or with
+#     exponential backoff when there isn't one
+#
+# The method names mirror the meraki lib functions the getter uses:
+#   client = DashboardClient('your-api-key-here',rate_limit=5,pool_size=8)
+#   client.getnetworklist('org-id-here')
+#   client.getorginventory('org-id-here')
+#   client.getssids('network-id-here')
+#
+# base_url can point the client at another host, e.g. a local stub server when testing.
+
+import requests
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self,rate,burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(rate,1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if (self.tokens >= 1):
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DashboardClient:
+    base_url = 'https://api.meraki.com/api/v0'
+
+    def __init__(self,api_key,base_url=None,rate_limit=5,pool_size=10,max_retries=5,backoff=1.0,timeout=30):
+        if (base_url is not None):
+            self.base_url = base_url.rstrip('/')
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1,pool_maxsize=pool_size)
+        self.session.mount('https://',adapter)
+        self.session.mount('http://',adapter)
+        self.session.headers.update({
+            'X-Cisco-Meraki-API-Key': api_key,
+            'Content-Type': 'application/json'
+        })
+
+    def getnetworklist(self,org_id):
+        return self.get('/organizations/' + str(org_id) + '/networks')
+
+    def getorginventory(self,org_id):
+        return self.get('/organizations/' + str(org_id) + '/inventory')
+
+    def getssids(self,network_id):
+        return self.get('/networks/' + str(network_id) + '/ssids')
+
+    def get(self,path):
+        retries = 0
+        while True:
+            self.rate_limiter.acquire()
+            response = self.session.get(self.base_url + path,timeout=self.timeout)
+            if (response.status_code == 429) and (retries < self.max_retries):
+                time.sleep(self.__retry_delay(response,retries))
+                retries += 1
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def close(self):
+        self.session.close()
+
+    def __retry_delay(self,response,retries):
+        retry_after = response.headers.get('Retry-After')
+        try:
+            return float(retry_after)
+        except (TypeError,ValueError):
+            return self.backoff * (2 ** retries)
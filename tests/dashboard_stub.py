@@ -0,0 +1,97 @@
+# A local http server that answers the dashboard api calls DashboardClient makes, for tests.
+#
+# It serves a FakeOrg (see benchmarks/fake_meraki) and can slow down, throttle or fail
+# requests the way the dashboard does:
+#   stub = DashboardStub(FakeOrg(networks=20),latency=0.01,throttle_every=3).start()
+#   client = DashboardClient('key',base_url=stub.base_url)
+#   ...
+#   stub.stop()
+#
+#   latency          seconds to wait before answering, or a function of the request path
+#   throttle_every   answer every nth request with a 429 instead (0 never does)
+#   retry_after      the Retry-After header sent with a 429, None to leave it out
+#   failing          request paths answered with a 500
+#
+# stub.paths lists the paths requested, throttled ones included, and stub.throttled counts
+# the 429s sent.
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','benchmarks'))
+
+from fake_meraki import FakeOrg
+
+
+class DashboardStub:
+    def __init__(self,org,latency=0.0,throttle_every=0,retry_after='0.01',failing=()):
+        self.org = org
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+        self.paths = []
+        self.throttled = 0
+        self.server = None
+
+    def start(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1',0),DashboardStubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        threading.Thread(target=self.server.serve_forever,daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:' + str(self.server.server_address[1])
+
+    def respond(self,path):
+        with self.lock:
+            self.paths.append(path)
+            count = len(self.paths)
+        latency = self.latency(path) if callable(self.latency) else self.latency
+        if (latency > 0):
+            time.sleep(latency)
+        if (self.throttle_every > 0) and (count % self.throttle_every == 0):
+            with self.lock:
+                self.throttled += 1
+            headers = {} if self.retry_after is None else {'Retry-After': self.retry_after}
+            return (429,headers,{'errors': ['Too many requests']})
+        if (path in self.failing):
+            return (500,{},{'errors': ['Internal error']})
+        parts = path.strip('/').split('/')
+        if (len(parts) == 3) and (parts[0] == 'organizations') and (parts[2] == 'networks'):
+            return (200,{},self.org.getnetworklist(parts[1]))
+        if (len(parts) == 3) and (parts[0] == 'organizations') and (parts[2] == 'inventory'):
+            return (200,{},self.org.getorginventory(parts[1]))
+        if (len(parts) == 3) and (parts[0] == 'networks') and (parts[2] == 'ssids') and (parts[1] in self.org.ssids):
+            return (200,{},self.org.getssids(parts[1]))
+        return (404,{},{'errors': ['Not found']})
+
+
+class DashboardStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        status,headers,payload = self.server.stub.respond(self.path)
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name,value in headers.items():
+            self.send_header(name,value)
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self,format,*args):
+        pass
@@ -0,0 +1,41 @@
+# Tests for the Bssid records the getter keeps per ap/ssid pair.
+#
+#   python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_getter import Bssid
+
+
+class BssidTests(unittest.TestCase):
+    def test_from_values_matches_bssids(self):
+        for ap_model,ap_mac in (('MR53','0c:8d:db:00:00:01'),('MR33','e0:55:3d:ff:ff:ff'),('MR18','88:15:44:00:00:00')):
+            values = MerakiBssidCalculator.calculate_all_values(ap_model,ap_mac)
+            for ssid_number,bssids in MerakiBssidCalculator.calculate_all(ap_model,ap_mac).items():
+                bssid = Bssid('Corp',ap_mac,bssids,ssid_number - 1)
+                from_values = Bssid.from_values('Corp',ap_mac,values[ssid_number][0],values[ssid_number][1],ssid_number - 1)
+                self.assertEqual(from_values.bssids,bssids)
+                self.assertEqual(str(from_values),str(bssid))
+                self.assertEqual((from_values.ssid,from_values.ap,from_values.ssid_number),(bssid.ssid,bssid.ap,bssid.ssid_number))
+
+    def test_per_octet_bssids_are_kept_as_strings(self):
+        # octets the per octet calculation pushes past 0xff don't fit a 48-bit value
+        bssid = Bssid('Corp','0c:8d:db:00:00:01',{'2.4': '10c:8d:db:00:00:01', '5': '0e:8d:cb:00:00:01'})
+        self.assertEqual(bssid.bssid_24,'10c:8d:db:00:00:01')
+        self.assertEqual(bssid.bssid_5,MerakiBssidCalculator.mac_value('0e:8d:cb:00:00:01'))
+        self.assertEqual(bssid.bssids,{'2.4': '10c:8d:db:00:00:01', '5': '0e:8d:cb:00:00:01'})
+
+    def test_no_dict(self):
+        bssid = Bssid.from_values('Corp','0c:8d:db:00:00:01',1,2)
+        self.assertFalse(hasattr(bssid,'__dict__'))
+        self.assertIs(bssid.ssid,sys.intern('Corp'))
+        self.assertEqual(bssid.bssids,{'2.4': '00:00:00:00:00:01', '5': '00:00:00:00:00:02'})
+
+
+if __name__ == '__main__':
+    unittest.main()
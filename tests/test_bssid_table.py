@@ -0,0 +1,124 @@
+# Round trip tests for the memory mapped bssid table (BssidTableWriter and BssidTableReader).
+#
+#   python -m pytest tests
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_table import BssidTableMatch, BssidTableReader, write_bssid_table
+import meraki_bssid_table
+
+
+def sample_rows():
+    rows = []
+    for i,(ap_model,ap_mac) in enumerate((('MR53','0c:8d:db:00:00:01'),('MR33','e0:55:3d:00:00:02'),('MR18','00:18:0a:00:00:03'))):
+        for ssid_number,bssids in MerakiBssidCalculator.calculate_all(ap_model,ap_mac,range(1,5)).items():
+            rows.append(['Network ' + str(i),'SSID ' + str(ssid_number),ap_mac,bssids['2.4'],bssids['5']])
+    return rows
+
+
+class BssidTableTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory,'bssids.table')
+        self.readers = []
+
+    def tearDown(self):
+        for reader in self.readers:
+            reader.close()
+        shutil.rmtree(self.directory)
+
+    def write_and_open(self,rows):
+        write_bssid_table(rows,self.filename)
+        reader = BssidTableReader(self.filename)
+        self.readers.append(reader)
+        return reader
+
+    def test_round_trip(self):
+        rows = sample_rows()
+        table = self.write_and_open(rows)
+        self.assertEqual(len(table),len(rows) * 2)
+        for network,ssid,ap_mac,bssid_24,bssid_5 in rows:
+            self.assertEqual(table.lookup(bssid_24),BssidTableMatch(network=network,ssid=ssid,ap_mac=ap_mac,band='2.4'))
+            self.assertEqual(table.lookup(bssid_5.upper()),BssidTableMatch(network=network,ssid=ssid,ap_mac=ap_mac,band='5'))
+            self.assertEqual(table.lookup(MerakiBssidCalculator.mac_value(bssid_5)).band,'5')
+        self.assertEqual(table.lookup_many([rows[0][3],'00:00:00:00:00:00','junk']),[table.lookup(rows[0][3]),None,None])
+
+    def test_records_are_sorted(self):
+        write_bssid_table(sample_rows(),self.filename)
+        with open(self.filename,'rb') as tablefile:
+            data = tablefile.read()
+        magic,version,record_size,count,records_offset,strings_offset = meraki_bssid_table.header_format.unpack_from(data,0)
+        keys = [data[records_offset + i * record_size:records_offset + i * record_size + 6] for i in range(count)]
+        self.assertEqual(count,len(sample_rows()) * 2)
+        self.assertEqual(keys,sorted(keys))
+
+    def test_unknown_bssids(self):
+        table = self.write_and_open(sample_rows())
+        for bssid in ('00:00:00:00:00:00','ff:ff:ff:ff:ff:ff','junk','',-1,1 << 48):
+            self.assertIsNone(table.lookup(bssid))
+            self.assertEqual(table.lookup_all(bssid),[])
+
+    def test_duplicate_bssids(self):
+        rows = [
+            ['Branch','Corp','0c:8d:db:00:00:01','22:8d:db:00:00:01','22:8d:cb:00:00:01'],
+            ['Branch','Guest','0c:8d:db:00:00:01','02:00:00:00:00:01','22:8d:db:00:00:01'],
+            ['Lab','Corp','0c:8d:db:00:00:01','22:8d:db:00:00:01','02:00:00:00:00:02']
+        ]
+        table = self.write_and_open(rows)
+        # duplicates keep the order they were written in
+        self.assertEqual(table.lookup_all('22:8d:db:00:00:01'),[
+            BssidTableMatch(network='Branch',ssid='Corp',ap_mac='0c:8d:db:00:00:01',band='2.4'),
+            BssidTableMatch(network='Branch',ssid='Guest',ap_mac='0c:8d:db:00:00:01',band='5'),
+            BssidTableMatch(network='Lab',ssid='Corp',ap_mac='0c:8d:db:00:00:01',band='2.4')
+        ])
+        self.assertEqual(table.lookup('22:8d:db:00:00:01'),table.lookup_all('22:8d:db:00:00:01')[0])
+        self.assertEqual(len(table.lookup_all('02:00:00:00:00:01')),1)
+
+    def test_empty_table(self):
+        table = self.write_and_open([])
+        self.assertEqual(len(table),0)
+        self.assertIsNone(table.lookup('22:8d:db:00:00:00'))
+        self.assertEqual(table.lookup_all('22:8d:db:00:00:00'),[])
+
+    def test_skips_bssids_that_are_not_macs(self):
+        rows = [['Branch','Corp','0c:8d:db:00:00:01','10c:8d:db:00:00:01','22:8d:cb:00:00:01'],['Branch','Guest','0c:8d:db:00:00:02','x1:8d:db:00:00:02','']]
+        table = self.write_and_open(rows)
+        self.assertEqual(len(table),1)
+        self.assertEqual(table.lookup('22:8d:cb:00:00:01').ssid,'Corp')
+
+    def test_strings_are_stored_once(self):
+        rows = [['Branch','Corp','0c:8d:db:00:00:01','22:8d:db:00:00:%02x' % i,'22:8d:cb:00:00:%02x' % i] for i in range(50)]
+        write_bssid_table(rows,self.filename)
+        strings = len('Branch') + len('Corp') + len('0c:8d:db:00:00:01') + 3 * meraki_bssid_table.string_length_format.size
+        records = 100 * meraki_bssid_table.record_format.size
+        self.assertEqual(os.path.getsize(self.filename),meraki_bssid_table.header_format.size + records + strings)
+
+    def test_replace_while_mapped(self):
+        old_rows = sample_rows()
+        old_table = self.write_and_open(old_rows)
+        new_rows = [['New network','New SSID','0c:8d:db:00:00:09','22:8d:db:00:00:09','22:8d:cb:00:00:09']]
+        new_table = self.write_and_open(new_rows)
+        # the reader that mapped the old table keeps answering from it
+        self.assertEqual(len(old_table),len(old_rows) * 2)
+        self.assertEqual(old_table.lookup(old_rows[0][3]).network,old_rows[0][0])
+        self.assertIsNone(old_table.lookup('22:8d:db:00:00:09'))
+        self.assertEqual(len(new_table),2)
+        self.assertEqual(new_table.lookup('22:8d:db:00:00:09').network,'New network')
+        self.assertFalse(os.path.exists(self.filename + '.tmp'))
+
+    def test_rejects_other_files(self):
+        with open(self.filename,'wb') as tablefile:
+            tablefile.write(b'not a table' * 10)
+        with self.assertRaises(ValueError):
+            BssidTableReader(self.filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
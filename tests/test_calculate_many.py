@@ -0,0 +1,140 @@
+# Equivalence tests for MerakiBssidCalculator.calculate_many against calling calculate per row.
+#
+#   python -m pytest tests
+#   python -m unittest discover tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+import meraki_bssid_calculator
+from meraki_bssid_calculator import MerakiBssidCalculator
+
+numpy = meraki_bssid_calculator.load_numpy()
+
+# octets around the edges, where an offset can carry out of an octet and calculate falls
+# back to the per octet calculation
+tails = ['00:00:00','00:00:01','12:34:56','7f:80:81','fe:ff:00','ff:ff:ff','0a:fb:fc']
+
+
+def sample_rows():
+    ap_models = []
+    ap_macs = []
+    ssid_numbers = []
+    for ap_model,family in sorted(MerakiBssidCalculator.ap_families.items()):
+        for oui in sorted(MerakiBssidCalculator.offset_families[family]):
+            for i,tail in enumerate(tails):
+                ap_models.append(ap_model)
+                ap_macs.append(oui + ':' + tail)
+                ssid_numbers.append((i * 7 + len(ap_models)) % 15 + 1)
+    return (ap_models,ap_macs,ssid_numbers)
+
+
+def calculate_loop(ap_models,ap_macs,ssid_numbers):
+    bssids = {'2.4': [], '5': []}
+    for ap_model,ap_mac,ssid_number in zip(ap_models,ap_macs,ssid_numbers):
+        ap_bssids = MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number)
+        bssids['2.4'].append(ap_bssids['2.4'])
+        bssids['5'].append(ap_bssids['5'])
+    return bssids
+
+
+class CalculateManyTests(object):
+    def test_mac_strings(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,ap_macs,ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+    def test_uppercase_tails(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        ap_macs = [ap_mac[:9] + ap_mac[9:].upper() for ap_mac in ap_macs]
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,ap_macs,ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+    def test_malformed_macs(self):
+        ap_macs = ['0c:8d:db:00:00:1 ','0c:8d:db: 0:00:01','0c:8d:db:00:00:01']
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many('MR53',ap_macs,3),
+            calculate_loop(['MR53'] * 3,ap_macs,[3] * 3)
+        )
+        with self.assertRaises(ValueError):
+            MerakiBssidCalculator.calculate_many('MR53',['0c:8d:db:00:00:01','0c:8d:db:1_:00:00'],3)
+
+    def test_mac_integers(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        mac_values = [MerakiBssidCalculator.mac_value(ap_mac) for ap_mac in ap_macs]
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,mac_values,ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+    def test_packed_macs(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        packed = b''.join(bytes.fromhex(ap_mac.replace(':','')) for ap_mac in ap_macs)
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,packed,ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,memoryview(bytearray(packed)),ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+    def test_single_model_and_ssid(self):
+        ap_macs = ['0c:8d:db:' + tail for tail in tails]
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many('MR53',ap_macs,12),
+            calculate_loop(['MR53'] * len(ap_macs),ap_macs,[12] * len(ap_macs))
+        )
+
+    def test_empty(self):
+        self.assertEqual(MerakiBssidCalculator.calculate_many([],[],[]),{'2.4': [], '5': []})
+
+    def test_unknown_model_oui_and_ssid(self):
+        for ap_model,ap_mac,ssid_number in (('MR99','0c:8d:db:00:00:01',3),('MR53','00:00:00:00:00:01',3),('MR53','0c:8d:db:00:00:01',16)):
+            with self.assertRaises(KeyError) as scalar:
+                MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number)
+            with self.assertRaises(KeyError) as batch:
+                MerakiBssidCalculator.calculate_many(['MR53',ap_model],['0c:8d:db:00:00:02',ap_mac],[3,ssid_number])
+            self.assertEqual(batch.exception.args,scalar.exception.args)
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            MerakiBssidCalculator.calculate_many(['MR53','MR53'],['0c:8d:db:00:00:01'],3)
+
+
+@unittest.skipIf(numpy is None,'numpy is not installed')
+class NumpyCalculateManyTests(CalculateManyTests,unittest.TestCase):
+    def test_uint64_array(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        mac_values = numpy.array([MerakiBssidCalculator.mac_value(ap_mac) for ap_mac in ap_macs],dtype=numpy.uint64)
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,mac_values,numpy.array(ssid_numbers)),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+    def test_packed_array(self):
+        ap_models,ap_macs,ssid_numbers = sample_rows()
+        packed = numpy.frombuffer(b''.join(bytes.fromhex(ap_mac.replace(':','')) for ap_mac in ap_macs),dtype=numpy.uint8).reshape(-1,6)
+        self.assertEqual(
+            MerakiBssidCalculator.calculate_many(ap_models,packed,ssid_numbers),
+            calculate_loop(ap_models,ap_macs,ssid_numbers)
+        )
+
+
+class PythonCalculateManyTests(CalculateManyTests,unittest.TestCase):
+    def setUp(self):
+        meraki_bssid_calculator.numpy = None
+
+    def tearDown(self):
+        meraki_bssid_calculator.numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Tests that the compiled engine behind calculate and calculate_all gives byte-identical
+# output to the per octet calculation (calculate_bssid) it replaced.
+#
+#   python -m pytest tests
+
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+
+# every combination of these in the last 3 octets, so each offset meets octets at both ends
+# of the range and on either side of a nibble boundary
+edge_octets = ['00','0f','f0','ff']
+tails = [':'.join(octets) for octets in itertools.product(edge_octets,repeat=3)]
+
+
+def per_octet_bssid(ap_model,ap_mac,band,ssid_number):
+    return MerakiBssidCalculator.calculate_bssid(ap_mac,MerakiBssidCalculator.ap_offset(ap_model)[ap_mac[:8]][band][ssid_number])
+
+
+class CompiledEngineTests(unittest.TestCase):
+    def test_calculate(self):
+        for ap_model,family in sorted(MerakiBssidCalculator.ap_families.items()):
+            for oui,radios in sorted(MerakiBssidCalculator.offset_families[family].items()):
+                for tail in tails:
+                    ap_mac = oui + ':' + tail
+                    for ssid_number in radios['2.4']:
+                        self.assertEqual(MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number),{
+                            band: per_octet_bssid(ap_model,ap_mac,band,ssid_number) for band in ('2.4','5')
+                        },(ap_model,ap_mac,ssid_number))
+
+    def test_calculate_all(self):
+        for ap_model,family in sorted(MerakiBssidCalculator.ap_families.items()):
+            for oui,radios in sorted(MerakiBssidCalculator.offset_families[family].items()):
+                ssid_numbers = sorted(radios['2.4'])
+                for tail in tails:
+                    ap_mac = oui + ':' + tail
+                    self.assertEqual(MerakiBssidCalculator.calculate_all(ap_model,ap_mac,ssid_numbers),{
+                        ssid_number: {band: per_octet_bssid(ap_model,ap_mac,band,ssid_number) for band in ('2.4','5')}
+                        for ssid_number in ssid_numbers
+                    },(ap_model,ap_mac))
+
+    def test_calculate_all_values(self):
+        for ap_model,family in sorted(MerakiBssidCalculator.ap_families.items()):
+            for oui in sorted(MerakiBssidCalculator.offset_families[family]):
+                for tail in tails:
+                    ap_mac = oui + ':' + tail
+                    values = MerakiBssidCalculator.calculate_all_values(ap_model,ap_mac)
+                    self.assertEqual({
+                        ssid_number: {
+                            band: MerakiBssidCalculator.format_mac(value) if isinstance(value,int) else value
+                            for band,value in zip(('2.4','5'),bssid_values)
+                        }
+                        for ssid_number,bssid_values in values.items()
+                    },MerakiBssidCalculator.calculate_all(ap_model,ap_mac),(ap_model,ap_mac))
+
+    def test_negative_offsets(self):
+        # the 88:15:44, 0c:8d:db and e0:55:3d tables have offsets that take octets below 00
+        # (per octet, without borrowing from the octet before); those must come out the same
+        negative = 0
+        for ap_model,family in sorted(MerakiBssidCalculator.ap_families.items()):
+            for oui,radios in sorted(MerakiBssidCalculator.offset_families[family].items()):
+                for band,ssids in radios.items():
+                    for ssid_number,offsets in ssids.items():
+                        if min(offsets.values()) >= 0:
+                            continue
+                        ap_mac = oui + ':00:00:00'
+                        negative += 1
+                        self.assertEqual(
+                            MerakiBssidCalculator.calculate(ap_model,ap_mac,ssid_number)[band],
+                            per_octet_bssid(ap_model,ap_mac,band,ssid_number)
+                        )
+        self.assertGreater(negative,0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# Tests for the command line batch mode in meraki_bssid_cli.
+#
+#   python -m pytest tests
+
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')
+sys.path.insert(0,root)
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+import meraki_bssid_cli
+
+input_rows = [
+    'model,mac,ssid',
+    'MR53,0c:8d:db:00:00:01,3',
+    'MR33,E0:55:3D:00:00:02,',
+    '',
+    'MR99,0c:8d:db:00:00:03,1',
+    'MR53,0c:8d:db:00:00:04,abc',
+    'MR53,not-a-mac,1',
+    'MR18,00:18:0a:00:00:05,15',
+    'MR53,0c:8d:db:00:00:06,16'
+]
+
+
+class CliTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_filename = os.path.join(self.directory,'inventory.csv')
+        self.write_input(input_rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_input(self,lines):
+        with open(self.input_filename,'w') as infile:
+            infile.write('\n'.join(lines) + '\n')
+
+    def run_cli(self,*args):
+        output_filename = os.path.join(self.directory,'output')
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            status = meraki_bssid_cli.main([self.input_filename,'-o',output_filename] + list(args))
+        with open(output_filename) as outfile:
+            return (status,outfile.read(),stderr.getvalue())
+
+    def expected_rows(self):
+        rows = [['MR53','0c:8d:db:00:00:01','3'] + list(MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3).values())]
+        for ssid_number,bssids in MerakiBssidCalculator.calculate_all('MR33','e0:55:3d:00:00:02').items():
+            rows.append(['MR33','e0:55:3d:00:00:02',str(ssid_number),bssids['2.4'],bssids['5']])
+        rows.append(['MR18','00:18:0a:00:00:05','15'] + list(MerakiBssidCalculator.calculate('MR18','00:18:0a:00:00:05',15).values()))
+        return rows
+
+    def test_csv(self):
+        status,output,errors = self.run_cli()
+        rows = list(csv.reader(io.StringIO(output)))
+        self.assertEqual(rows[0],meraki_bssid_cli.output_header)
+        self.assertEqual(rows[1:],self.expected_rows())
+        self.assertEqual(status,1)
+        self.assertEqual(errors.splitlines(),[
+            'line 5: no offsets for MR99 0c:8d:db:00:00:03 ssid 1',
+            'line 6: invalid ssid number abc',
+            'line 7: invalid mac not-a-mac',
+            'line 9: no offsets for MR53 0c:8d:db:00:00:06 ssid 16'
+        ])
+
+    def test_header_is_optional(self):
+        self.write_input(input_rows[1:3])
+        status,output,errors = self.run_cli()
+        self.assertEqual(status,0)
+        self.assertEqual(errors,'')
+        self.assertEqual(list(csv.reader(io.StringIO(output)))[1:],self.expected_rows()[:16])
+        # only the first line can be a header
+        self.write_input(input_rows[1:3] + ['model,mac,ssid'])
+        status,output,errors = self.run_cli()
+        self.assertEqual(status,1)
+        self.assertEqual(errors,'line 3: invalid ssid number ssid\n')
+
+    def test_jsonl(self):
+        status,output,errors = self.run_cli('--format','jsonl')
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(
+            [[row['model'],row['mac'],str(row['ssid_number']),row['2.4'],row['5']] for row in rows],
+            self.expected_rows()
+        )
+        self.assertIsInstance(rows[0]['ssid_number'],int)
+        self.assertEqual(status,1)
+
+    def test_workers_give_the_same_output(self):
+        # small chunks, so the workers get several each and can finish out of order
+        self.write_input(input_rows * 20)
+        for output_format in ('csv','jsonl'):
+            serial = self.run_cli('--chunk-size','7','--format',output_format)
+            self.assertEqual(serial[0],1)
+            self.assertEqual(self.run_cli('--workers','3','--chunk-size','7','--format',output_format),serial)
+            self.assertEqual(self.run_cli('--workers','3','--format',output_format),serial)
+
+    def test_stdin_and_exit_status(self):
+        command = [sys.executable,os.path.join(root,'meraki_bssid_cli.py')]
+        result = subprocess.run(command,input='MR53,0c:8d:db:00:00:01,3\n',stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True)
+        self.assertEqual(result.returncode,0,result.stderr)
+        self.assertEqual(result.stdout.splitlines()[1],','.join(self.expected_rows()[0]))
+        result = subprocess.run(command,input='MR53,junk,3\n',stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True)
+        self.assertEqual(result.returncode,1)
+        self.assertEqual(result.stderr,'line 1: invalid mac junk\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
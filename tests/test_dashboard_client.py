@@ -0,0 +1,136 @@
+# Tests for DashboardClient and the getter's concurrent mode, against a local stub server.
+#
+#   python -m pytest tests
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+from dashboard_stub import DashboardStub, FakeOrg
+
+
+def varying_latency(path):
+    # uneven per request latency, so concurrent requests finish out of order
+    return (sum(path.encode('utf-8')) % 5) * 0.005
+
+
+@unittest.skipIf(requests is None,'requests is not installed')
+class DashboardClientTests(unittest.TestCase):
+    def setUp(self):
+        from meraki_dashboard_client import DashboardClient
+        self.DashboardClient = DashboardClient
+        self.org = FakeOrg(networks=5,aps_per_network=2)
+        self.stubs = []
+
+    def tearDown(self):
+        for stub in self.stubs:
+            stub.stop()
+
+    def start_stub(self,**kwargs):
+        stub = DashboardStub(self.org,**kwargs).start()
+        self.stubs.append(stub)
+        return stub
+
+    def test_responses(self):
+        stub = self.start_stub()
+        client = self.DashboardClient('key',base_url=stub.base_url,rate_limit=1000)
+        self.assertEqual(client.getnetworklist('1'),self.org.getnetworklist('1'))
+        self.assertEqual(client.getorginventory('1'),self.org.getorginventory('1'))
+        self.assertEqual(client.getssids('N_0'),self.org.getssids('N_0'))
+        self.assertEqual(stub.paths,['/organizations/1/networks','/organizations/1/inventory','/networks/N_0/ssids'])
+
+    def test_retries_429_after_retry_after(self):
+        stub = self.start_stub(throttle_every=2,retry_after='0.01')
+        client = self.DashboardClient('key',base_url=stub.base_url,rate_limit=1000)
+        for i in range(5):
+            self.assertEqual(client.getssids('N_1'),self.org.getssids('N_1'))
+        # ok, 429 and its retry, 429 and its retry...
+        self.assertEqual(stub.throttled,4)
+        self.assertEqual(len(stub.paths),9)
+
+    def test_backs_off_without_retry_after(self):
+        stub = self.start_stub(throttle_every=2,retry_after=None)
+        client = self.DashboardClient('key',base_url=stub.base_url,rate_limit=1000,backoff=0.1)
+        client.getssids('N_1')
+        started = time.monotonic()
+        self.assertEqual(client.getssids('N_1'),self.org.getssids('N_1'))
+        self.assertGreaterEqual(time.monotonic() - started,0.1)
+        self.assertEqual(stub.throttled,1)
+
+    def test_gives_up_after_max_retries(self):
+        stub = self.start_stub(throttle_every=1,retry_after='0')
+        client = self.DashboardClient('key',base_url=stub.base_url,rate_limit=1000,max_retries=2)
+        with self.assertRaises(requests.HTTPError) as raised:
+            client.getssids('N_1')
+        self.assertEqual(raised.exception.response.status_code,429)
+        self.assertEqual(len(stub.paths),3)
+
+    def test_rate_limit(self):
+        stub = self.start_stub()
+        client = self.DashboardClient('key',base_url=stub.base_url,rate_limit=20)
+        client.rate_limiter.tokens = 1
+        started = time.monotonic()
+        for i in range(6):
+            client.getssids('N_1')
+        self.assertGreaterEqual(time.monotonic() - started,0.25)
+
+
+@unittest.skipIf(requests is None,'requests is not installed')
+class ConcurrentGetterTests(unittest.TestCase):
+    def setUp(self):
+        from meraki_bssid_getter import MerakiBssidGetter
+        self.MerakiBssidGetter = MerakiBssidGetter
+        self.org = FakeOrg(networks=40,aps_per_network=2,templates=3)
+        self.stubs = []
+
+    def tearDown(self):
+        for stub in self.stubs:
+            stub.stop()
+
+    def start_stub(self,**kwargs):
+        stub = DashboardStub(self.org,**kwargs).start()
+        self.stubs.append(stub)
+        return stub
+
+    def ssid_requests(self,stub):
+        return len([path for path in stub.paths if path.endswith('/ssids')])
+
+    def test_same_rows_as_serial(self):
+        stub = self.start_stub(latency=varying_latency,throttle_every=7)
+        serial = self.MerakiBssidGetter('key',base_url=stub.base_url,rate_limit=1000)
+        concurrent = self.MerakiBssidGetter('key',workers=8,base_url=stub.base_url,rate_limit=1000)
+        rows = list(serial.iter_org_bssids('1'))
+        self.assertGreater(len(rows),0)
+        self.assertEqual(list(concurrent.iter_org_bssids('1')),rows)
+        self.assertGreater(stub.throttled,0)
+
+    def test_failed_fetch_cancels_queued_requests(self):
+        stub = self.start_stub(latency=0.02,failing=['/networks/N_3/ssids'])
+        bssid_getter = self.MerakiBssidGetter('key',workers=2,base_url=stub.base_url,rate_limit=1000)
+        with self.assertRaises(requests.HTTPError):
+            list(bssid_getter.iter_org_bssids('1'))
+        self.assertLess(self.ssid_requests(stub),12)
+
+    def test_stopping_early_cancels_queued_requests(self):
+        stub = self.start_stub(latency=0.02)
+        bssid_getter = self.MerakiBssidGetter('key',workers=2,base_url=stub.base_url,rate_limit=1000)
+        rows = bssid_getter.iter_org_bssids('1')
+        next(rows)
+        rows.close()
+        requested = self.ssid_requests(stub)
+        time.sleep(0.1)
+        self.assertEqual(self.ssid_requests(stub),requested)
+        self.assertLess(requested,12)
+
+
+if __name__ == '__main__':
+    unittest.main()
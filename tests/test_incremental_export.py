@@ -0,0 +1,123 @@
+# Tests for MerakiBssidGetter.export_org_bssids_incremental, run against a FakeOrg (see
+# benchmarks/fake_meraki) that's changed between runs.
+#
+#   python -m pytest tests
+
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','benchmarks'))
+
+from fake_meraki import FakeOrg
+from meraki_bssid_getter import MerakiBssidGetter
+
+
+class IncrementalExportTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory,'bssids.csv')
+        self.snapshot_filename = os.path.join(self.directory,'bssids.snapshot.json')
+        self.delta_filename = os.path.join(self.directory,'bssids.delta.csv')
+        self.org = FakeOrg(networks=6,aps_per_network=2,templates=2,ssids_per_network=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self):
+        bssid_getter = MerakiBssidGetter('key')
+        bssid_getter.dashboard = self.org
+        summary = bssid_getter.export_org_bssids_incremental('1',self.filename,snapshot_filename=self.snapshot_filename,delta_filename=self.delta_filename)
+        return (summary,self.read_csv(self.filename),self.read_csv(self.delta_filename))
+
+    def full_export(self):
+        bssid_getter = MerakiBssidGetter('key')
+        bssid_getter.dashboard = self.org
+        filename = os.path.join(self.directory,'full.csv')
+        bssid_getter.export_org_bssids_to_csv('1',filename)
+        return self.read_csv(filename)
+
+    def read_csv(self,filename):
+        with open(filename,newline='') as csvfile:
+            return list(csv.reader(csvfile))
+
+    def bound_networks(self,template_id):
+        return [network['name'] for network in self.org.networks if network.get('configTemplateId') == template_id]
+
+    def test_first_run(self):
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,self.full_export())
+        self.assertEqual(delta[0],['Change'] + rows[0])
+        self.assertEqual(delta[1:],[['added'] + row for row in rows[1:]])
+        self.assertEqual(summary,{'networks': 6, 'recalculated': 6, 'added': len(rows) - 1, 'removed': 0, 'changed': 0})
+
+    def test_unchanged(self):
+        first_summary,first_rows,first_delta = self.export()
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,first_rows)
+        self.assertEqual(delta,first_delta[:1])
+        self.assertEqual(summary,{'networks': 6, 'recalculated': 0, 'added': 0, 'removed': 0, 'changed': 0})
+
+    def test_renamed_template_ssid(self):
+        self.export()
+        self.org.ssids['L_0'][1]['name'] = 'Renamed'
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,self.full_export())
+        bound = self.bound_networks('L_0')
+        self.assertGreater(len(bound),1)
+        # one row per ap of every network bound to the template, all marked changed
+        self.assertEqual(sorted(delta[1:]),sorted(['changed'] + row for row in rows[1:] if row[1] == 'Renamed'))
+        self.assertEqual(sorted(set(row[1] for row in delta[1:])),bound)
+        self.assertEqual(summary['changed'],len(bound) * 2)
+        self.assertEqual(summary['recalculated'],len(bound))
+
+    def test_removed_network(self):
+        first_summary,first_rows,first_delta = self.export()
+        removed = self.org.networks.pop(3)
+        summary,rows,delta = self.export()
+        removed_rows = [row for row in first_rows[1:] if row[0] == removed['name']]
+        self.assertEqual(len(removed_rows),6)
+        self.assertEqual(sorted(delta[1:]),sorted(['removed'] + row for row in removed_rows))
+        self.assertEqual(rows,[row for row in first_rows if row[0] != removed['name']])
+        self.assertEqual(summary,{'networks': 5, 'recalculated': 0, 'added': 0, 'removed': 6, 'changed': 0})
+
+    def test_added_and_removed_aps(self):
+        self.export()
+        moved = [device for device in self.org.inventory if device['networkId'] == 'N_1' and device['model'][:2] == 'MR'][0]
+        moved['networkId'] = 'N_5'
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,self.full_export())
+        changes = sorted((row[0],row[1],row[3]) for row in delta[1:])
+        self.assertEqual(changes,sorted(
+            [('added','Network 5',moved['mac'])] * 3 + [('removed','Network 1',moved['mac'])] * 3
+        ))
+        self.assertEqual(summary['recalculated'],2)
+
+    def test_renamed_network(self):
+        self.export()
+        self.org.networks[2]['name'] = 'Renamed network'
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,self.full_export())
+        self.assertEqual(sorted(delta[1:]),sorted(['changed'] + row for row in rows[1:] if row[0] == 'Renamed network'))
+        self.assertEqual(summary['changed'],6)
+
+    def test_snapshot_version_mismatch(self):
+        first_summary,first_rows,first_delta = self.export()
+        with open(self.snapshot_filename) as snapshotfile:
+            snapshot = json.load(snapshotfile)
+        snapshot['version'] = -1
+        with open(self.snapshot_filename,'w') as snapshotfile:
+            json.dump(snapshot,snapshotfile)
+        summary,rows,delta = self.export()
+        self.assertEqual(rows,first_rows)
+        self.assertEqual(delta,first_delta)
+        self.assertEqual(summary,first_summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
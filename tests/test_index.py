@@ -0,0 +1,97 @@
+# Tests for BssidIndex, with and without numpy.
+#
+#   python -m pytest tests
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+import meraki_bssid_calculator
+from meraki_bssid_calculator import MerakiBssidCalculator
+from meraki_bssid_index import BssidIndex, BssidMatch
+
+numpy = meraki_bssid_calculator.load_numpy()
+
+inventory = [
+    {'mac': '0c:8d:db:00:00:01', 'networkId': 'N_1', 'model': 'MR53', 'serial': 'Q2XX-0001'},
+    {'mac': 'E0:55:3D:00:00:02', 'networkId': 'N_1', 'model': 'MR33', 'serial': 'Q2XX-0002'},
+    {'mac': '00:18:0a:00:00:03', 'networkId': None, 'model': 'MR18', 'serial': 'Q2XX-0003'},
+    {'mac': 'e0:55:3d:00:00:04', 'networkId': 'N_2', 'model': 'MS220-8P', 'serial': 'Q2XX-0004'},
+    {'mac': 'e0:55:3d:00:00:05', 'networkId': 'N_2', 'serial': 'Q2XX-0005'},
+    {'mac': 'not a mac', 'networkId': 'N_2', 'model': 'MR33', 'serial': 'Q2XX-0006'}
+]
+
+
+def expected_matches(ap_model,ap_mac,network_id):
+    matches = {}
+    for ssid_number,bssids in MerakiBssidCalculator.calculate_all(ap_model,ap_mac).items():
+        for band,bssid in bssids.items():
+            matches[bssid] = BssidMatch(ap_mac=ap_mac,model=ap_model,ssid_number=ssid_number,band=band,network_id=network_id)
+    return matches
+
+
+class BssidIndexTests(object):
+    def test_lookup(self):
+        index = BssidIndex(inventory)
+        expected = {}
+        expected.update(expected_matches('MR53','0c:8d:db:00:00:01','N_1'))
+        expected.update(expected_matches('MR33','e0:55:3d:00:00:02','N_1'))
+        expected.update(expected_matches('MR18','00:18:0a:00:00:03',None))
+        self.assertEqual(len(index),len(expected))
+        for bssid,match in expected.items():
+            self.assertEqual(index.lookup(bssid),match)
+            self.assertEqual(index.lookup(bssid.upper()),match)
+            self.assertEqual(index.lookup(MerakiBssidCalculator.mac_value(bssid)),match)
+
+    def test_lookup_unknown(self):
+        index = BssidIndex(inventory)
+        for bssid in ('00:00:00:00:00:01','e0:55:3d:00:00:04','junk','',0):
+            self.assertIsNone(index.lookup(bssid))
+            self.assertEqual(index.lookup_all(bssid),[])
+
+    def test_tuple_inventory(self):
+        index = BssidIndex([('MR53','0c:8d:db:00:00:01','N_1'),('MR33','e0:55:3d:00:00:02')])
+        bssid = MerakiBssidCalculator.calculate('MR33','e0:55:3d:00:00:02',4)['5']
+        self.assertEqual(index.lookup(bssid),BssidMatch(ap_mac='e0:55:3d:00:00:02',model='MR33',ssid_number=4,band='5',network_id=None))
+        bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',9)['2.4']
+        self.assertEqual(index.lookup(bssid).network_id,'N_1')
+
+    def test_duplicate_aps(self):
+        index = BssidIndex([('MR53','0c:8d:db:00:00:01','N_1'),('MR53','0c:8d:db:00:00:01','N_2')])
+        bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3)['5']
+        self.assertEqual(index.lookup(bssid).network_id,'N_1')
+        self.assertEqual([match.network_id for match in index.lookup_all(bssid)],['N_1','N_2'])
+        self.assertEqual(index.lookup_many([bssid]),[index.lookup(bssid)])
+
+    def test_lookup_many(self):
+        index = BssidIndex(inventory)
+        bssids = list(expected_matches('MR53','0c:8d:db:00:00:01','N_1'))
+        bssids += ['00:00:00:00:00:01','junk',bssids[0].upper()]
+        bssids += list(expected_matches('MR18','00:18:0a:00:00:03',None))
+        self.assertEqual(index.lookup_many(bssids),[index.lookup(bssid) for bssid in bssids])
+        self.assertEqual(index.lookup_many([]),[])
+
+    def test_empty_index(self):
+        index = BssidIndex([])
+        self.assertEqual(len(index),0)
+        self.assertIsNone(index.lookup('22:8d:db:00:00:00'))
+        self.assertEqual(index.lookup_many(['22:8d:db:00:00:00']),[None])
+
+
+@unittest.skipIf(numpy is None,'numpy is not installed')
+class NumpyBssidIndexTests(BssidIndexTests,unittest.TestCase):
+    pass
+
+
+class PythonBssidIndexTests(BssidIndexTests,unittest.TestCase):
+    def setUp(self):
+        meraki_bssid_calculator.numpy = None
+
+    def tearDown(self):
+        meraki_bssid_calculator.numpy = numpy
+
+
+if __name__ == '__main__':
+    unittest.main()
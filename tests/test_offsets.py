@@ -0,0 +1,82 @@
+# Tests that the precompiled offset tables in meraki_bssid_offsets match offset_families,
+# and that importing the calculator and the modules built on it stays cheap.
+#
+#   python -m pytest tests
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')
+sys.path.insert(0,root)
+
+import meraki_bssid_calculator
+from meraki_bssid_calculator import MerakiBssidCalculator
+
+heavy_modules = ('numpy','requests','meraki')
+import_modules = (
+    'meraki_bssid_calculator',
+    'meraki_bssid_getter',
+    'meraki_bssid_cli',
+    'meraki_bssid_index',
+    'meraki_bssid_table',
+    'meraki_bssid_sqlite',
+    'meraki_bssid_service',
+    'meraki_bssid_scans',
+    'meraki_bssid_orgs'
+)
+# milliseconds, best of import_repeat fresh interpreters.  The calculator takes about 2ms;
+# falling back to compiling the tables is caught by checking they were precompiled, and this
+# catches anything heavier (numpy alone takes tens of milliseconds)
+calculator_import_budget = 15
+import_repeat = 5
+
+
+def import_time(module,repeat=import_repeat):
+    script = (
+        'import sys,time\n'
+        'started = time.perf_counter()\n'
+        'import ' + module + '\n'
+        'seconds = time.perf_counter() - started\n'
+        'import json\n'
+        'import meraki_bssid_calculator\n'
+        'print(json.dumps([seconds,[name for name in ' + repr(list(heavy_modules)) + ' if name in sys.modules],'
+        'meraki_bssid_calculator.precompiled_offsets is not None]))\n'
+    )
+    # time imports the way an installed copy runs them, from cached bytecode
+    environment = dict(os.environ)
+    environment.pop('PYTHONDONTWRITEBYTECODE',None)
+    runs = []
+    for i in range(repeat + 1):
+        output = subprocess.check_output([sys.executable,'-c',script],cwd=root,env=environment)
+        runs.append(json.loads(output.decode('utf-8')))
+    return min(runs[1:] or runs)
+
+
+class OffsetsTests(unittest.TestCase):
+    def test_build_offsets_check(self):
+        result = subprocess.run([sys.executable,os.path.join(root,'build_offsets.py'),'--check'],stdout=subprocess.PIPE,stderr=subprocess.PIPE,universal_newlines=True)
+        self.assertEqual(result.returncode,0,result.stderr)
+
+    def test_precompiled_tables_are_used(self):
+        self.assertIsNotNone(meraki_bssid_calculator.precompiled_offsets)
+        self.assertEqual(meraki_bssid_calculator.precompiled_offsets,MerakiBssidCalculator.compile_family_offsets())
+        self.assertEqual(MerakiBssidCalculator.compiled_offsets,MerakiBssidCalculator.compile_offsets())
+
+
+class ImportTests(unittest.TestCase):
+    def test_calculator_import_time(self):
+        seconds,loaded,precompiled = import_time('meraki_bssid_calculator')
+        self.assertTrue(precompiled)
+        self.assertLess(seconds * 1000,calculator_import_budget)
+
+    def test_no_heavy_imports(self):
+        for module in import_modules:
+            seconds,loaded,precompiled = import_time(module,repeat=0)
+            self.assertEqual(loaded,[],module)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Tests for exporting many orgs at once with meraki_bssid_orgs, against a local stub server.
+#
+#   python -m pytest tests
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+from dashboard_stub import DashboardStub, FakeOrg
+
+
+@unittest.skipIf(requests is None,'requests is not installed')
+class ExportManyOrgsTests(unittest.TestCase):
+    def setUp(self):
+        from meraki_bssid_getter import MerakiBssidGetter
+        import meraki_bssid_orgs
+        self.meraki_bssid_orgs = meraki_bssid_orgs
+        self.directory = tempfile.mkdtemp()
+        # the stub answers every org id with the same org, except the one that fails
+        self.stub = DashboardStub(FakeOrg(networks=4,aps_per_network=2,templates=1),failing=['/organizations/bad/networks']).start()
+        filename = os.path.join(self.directory,'expected.csv')
+        MerakiBssidGetter('key',base_url=self.stub.base_url,rate_limit=1000).export_org_bssids_to_csv('1',filename)
+        self.expected_rows = self.read_csv(filename)
+
+    def tearDown(self):
+        self.stub.stop()
+        shutil.rmtree(self.directory)
+
+    def read_csv(self,filename):
+        with open(filename,newline='') as csvfile:
+            return list(csv.reader(csvfile))
+
+    def export(self,org_ids,**kwargs):
+        return self.meraki_bssid_orgs.export_many_orgs('key',org_ids,base_url=self.stub.base_url,rate_limit=1000,**kwargs)
+
+    def test_per_org_files(self):
+        filename_pattern = os.path.join(self.directory,'o-{org_id}.csv')
+        report = self.export(['1','bad','2'],filename_pattern=filename_pattern,processes=2)
+        self.assertEqual(report['exported'],{org_id: filename_pattern.format(org_id=org_id) for org_id in ('1','2')})
+        self.assertEqual(list(report['failed']),['bad'])
+        self.assertIn('500',report['failed']['bad'])
+        for org_id in ('1','2'):
+            self.assertEqual(self.read_csv(filename_pattern.format(org_id=org_id)),self.expected_rows)
+        self.assertEqual(sorted(os.listdir(self.directory)),['expected.csv','o-1.csv','o-2.csv'])
+
+    def test_merged_output_order(self):
+        merged_filename = os.path.join(self.directory,'merged.csv')
+        report = self.export(['3','bad','1','2'],filename_pattern=None,merged_filename=merged_filename,processes=3)
+        self.assertEqual(report['exported'],{'3': None, '1': None, '2': None})
+        self.assertEqual(list(report['failed']),['bad'])
+        rows = self.read_csv(merged_filename)
+        self.assertEqual(rows[0],self.meraki_bssid_orgs.merged_csv_header)
+        self.assertEqual(rows[1:],[[org_id] + row for org_id in ('3','1','2') for row in self.expected_rows[1:]])
+        self.assertEqual(sorted(os.listdir(self.directory)),['expected.csv','merged.csv'])
+
+    def test_repeated_org_ids(self):
+        filename_pattern = os.path.join(self.directory,'o-{org_id}.csv')
+        report = self.export(['1','bad','1','bad','1'],filename_pattern=filename_pattern,processes=3)
+        self.assertEqual(report,{'exported': {'1': filename_pattern.format(org_id='1')}, 'failed': {'bad': report['failed']['bad']}})
+        self.assertEqual(self.read_csv(filename_pattern.format(org_id='1')),self.expected_rows)
+        networks_requests = [path for path in self.stub.paths if path.endswith('/networks')]
+        self.assertEqual(sorted(networks_requests),['/organizations/1/networks'] * 2 + ['/organizations/bad/networks'])
+
+    def test_serial(self):
+        merged_filename = os.path.join(self.directory,'merged.csv')
+        report = self.export(['2','1'],filename_pattern=None,merged_filename=merged_filename,processes=1)
+        self.assertEqual(report['failed'],{})
+        self.assertEqual(self.read_csv(merged_filename)[1:],[[org_id] + row for org_id in ('2','1') for row in self.expected_rows[1:]])
+
+
+if __name__ == '__main__':
+    unittest.main()
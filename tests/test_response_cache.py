@@ -0,0 +1,174 @@
+# Tests for the persistent dashboard response cache, on its own and shared by the getter's
+# worker threads against a local stub server.
+#
+#   python -m pytest tests
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+from dashboard_stub import DashboardStub, FakeOrg
+from meraki_bssid_cache import CacheMiss, ResponseCache
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory,'responses.sqlite')
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.directory)
+
+    def open_cache(self,**kwargs):
+        cache = ResponseCache(self.filename,**kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def age(self,cache,endpoint,key,seconds):
+        with cache.lock:
+            cache.connection.execute('UPDATE responses SET fetched = fetched - ? WHERE endpoint = ? AND key = ?',(seconds,endpoint,key))
+            cache.connection.commit()
+
+
+class ResponseCacheTests(ResponseCacheTestCase):
+    def test_get_and_put(self):
+        cache = self.open_cache()
+        self.assertIsNone(cache.get('getssids','N_1'))
+        cache.put('getssids','N_1',[{'number': 0, 'name': 'Corp', 'enabled': True}])
+        cache.put('getorginventory',1,[{'mac': '0c:8d:db:00:00:01'}])
+        self.assertEqual(cache.get('getssids','N_1'),[{'number': 0, 'name': 'Corp', 'enabled': True}])
+        self.assertEqual(cache.get('getorginventory','1'),[{'mac': '0c:8d:db:00:00:01'}])
+        self.assertIsNone(cache.get('getnetworklist','N_1'))
+        cache.put('getssids','N_1',[])
+        self.assertEqual(cache.get('getssids','N_1'),[])
+
+    def test_per_endpoint_ttls(self):
+        cache = self.open_cache(ttls={'getssids': 300},default_ttl=3600)
+        cache.put('getssids','N_1',['ssids'])
+        cache.put('getnetworklist','1',['networks'])
+        self.age(cache,'getssids','N_1',200)
+        self.age(cache,'getnetworklist','1',200)
+        self.assertEqual(cache.get('getssids','N_1'),['ssids'])
+        self.assertEqual(cache.get('getnetworklist','1'),['networks'])
+        self.age(cache,'getssids','N_1',200)
+        self.age(cache,'getnetworklist','1',200)
+        self.assertIsNone(cache.get('getssids','N_1'))
+        self.assertEqual(cache.get('getnetworklist','1'),['networks'])
+        self.assertEqual(cache.get('getssids','N_1',ignore_ttl=True),['ssids'])
+        self.age(cache,'getnetworklist','1',3600)
+        self.assertIsNone(cache.get('getnetworklist','1'))
+
+    def test_ttl_none_never_expires(self):
+        cache = self.open_cache(ttls={'getorginventory': None},default_ttl=None)
+        cache.put('getorginventory','1',['inventory'])
+        cache.put('getssids','N_1',['ssids'])
+        self.age(cache,'getorginventory','1',10 ** 9)
+        self.age(cache,'getssids','N_1',10 ** 9)
+        self.assertEqual(cache.get('getorginventory','1'),['inventory'])
+        self.assertEqual(cache.get('getssids','N_1'),['ssids'])
+
+    def test_invalidate(self):
+        cache = self.open_cache()
+
+        def fill():
+            for endpoint,key in (('getssids','N_1'),('getssids','N_2'),('getnetworklist','1'),('getorginventory','1')):
+                cache.put(endpoint,key,[endpoint,key])
+
+        def cached():
+            return [(endpoint,key) for endpoint,key in (('getssids','N_1'),('getssids','N_2'),('getnetworklist','1'),('getorginventory','1')) if cache.get(endpoint,key) is not None]
+
+        fill()
+        cache.invalidate('getssids','N_1')
+        self.assertEqual(cached(),[('getssids','N_2'),('getnetworklist','1'),('getorginventory','1')])
+        cache.invalidate('getssids')
+        self.assertEqual(cached(),[('getnetworklist','1'),('getorginventory','1')])
+        cache.invalidate()
+        self.assertEqual(cached(),[])
+        with self.assertRaises(ValueError):
+            cache.invalidate(key='N_1')
+
+    def test_shared_between_connections(self):
+        first = self.open_cache()
+        second = self.open_cache()
+        first.put('getssids','N_1',['ssids'])
+        self.assertEqual(second.get('getssids','N_1'),['ssids'])
+        second.invalidate('getssids','N_1')
+        self.assertIsNone(first.get('getssids','N_1'))
+
+    def test_cache_miss_is_a_key_error(self):
+        self.assertTrue(issubclass(CacheMiss,KeyError))
+
+
+@unittest.skipIf(requests is None,'requests is not installed')
+class CachedGetterTests(ResponseCacheTestCase):
+    def setUp(self):
+        ResponseCacheTestCase.setUp(self)
+        from meraki_bssid_getter import MerakiBssidGetter
+        self.MerakiBssidGetter = MerakiBssidGetter
+        self.org = FakeOrg(networks=30,aps_per_network=2,templates=3)
+        self.stub = DashboardStub(self.org).start()
+
+    def tearDown(self):
+        self.stub.stop()
+        ResponseCacheTestCase.tearDown(self)
+
+    def getter(self,cache,**kwargs):
+        return self.MerakiBssidGetter('key',base_url=self.stub.base_url,rate_limit=1000,response_cache=cache,**kwargs)
+
+    def test_threaded_getter_shares_the_cache(self):
+        cache = self.open_cache(ttls={'getssids': 300})
+        rows = list(self.getter(cache,workers=8).iter_org_bssids('1'))
+        self.assertGreater(len(rows),0)
+        requested = list(self.stub.paths)
+        ssid_requests = [path for path in requested if path.endswith('/ssids')]
+        # one request per network or template, each cached once
+        self.assertEqual(len(ssid_requests),len(set(ssid_requests)))
+        with cache.lock:
+            cached, = cache.connection.execute("SELECT COUNT(*) FROM responses WHERE endpoint = 'getssids'").fetchone()
+        self.assertEqual(cached,len(ssid_requests))
+        # a second run, serial or threaded, is answered from the cache
+        self.assertEqual(list(self.getter(cache,workers=8).iter_org_bssids('1')),rows)
+        self.assertEqual(list(self.getter(cache).iter_org_bssids('1')),rows)
+        self.assertEqual(self.stub.paths,requested)
+
+    def test_expired_entries_are_refetched(self):
+        cache = self.open_cache(ttls={'getssids': 300})
+        rows = list(self.getter(cache,workers=4).iter_org_bssids('1'))
+        self.age(cache,'getssids','N_1',600)
+        requested = len(self.stub.paths)
+        self.assertEqual(list(self.getter(cache,workers=4).iter_org_bssids('1')),rows)
+        self.assertEqual(self.stub.paths[requested:],['/networks/N_1/ssids'])
+
+    def test_offline(self):
+        cache = self.open_cache(ttls={'getssids': 300})
+        rows = list(self.getter(cache,workers=4).iter_org_bssids('1'))
+        self.age(cache,'getssids','N_1',10 ** 6)
+        requested = len(self.stub.paths)
+        offline = self.MerakiBssidGetter('key',response_cache=cache,offline=True,workers=4)
+        self.assertIsNone(offline.dashboard)
+        self.assertEqual(list(offline.iter_org_bssids('1')),rows)
+        cache.invalidate('getssids','N_1')
+        with self.assertRaises(CacheMiss):
+            list(offline.iter_org_bssids('1'))
+        with self.assertRaises(CacheMiss):
+            list(offline.iter_org_bssids('2'))
+        self.assertEqual(len(self.stub.paths),requested)
+        with self.assertRaises(ValueError):
+            self.MerakiBssidGetter('key',offline=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+# Tests for joining scan logs against an org's bssids (meraki_bssid_scans), using the
+# inventory fixture.
+#
+#   python -m pytest tests
+
+import contextlib
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+import meraki_bssid_scans
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)),'fixtures')
+
+with open(os.path.join(fixtures,'inventory.json')) as inventoryfile:
+    inventory = json.load(inventoryfile)
+
+mr53_bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3)['5']
+mr18_bssid = MerakiBssidCalculator.calculate('MR18','00:18:0a:00:00:03',15)['2.4']
+mr53_match = ['0c:8d:db:00:00:01','MR53','3','5','N_1']
+mr18_match = ['00:18:0a:00:00:03','MR18','15','2.4','N_2']
+
+csv_lines = [
+    'Timestamp,BSSID,RSSI\n',
+    '1,' + mr53_bssid + ',-40\n',
+    '2,00:00:00:00:00:01,-80\n',
+    '3,' + mr18_bssid.upper().replace(':','-') + ',-55\n',
+    '\n',
+    '4\n',
+    '5,junk,-70\n',
+    '6, ' + mr53_bssid.upper() + ' ,-42\n'
+]
+
+jsonl_lines = [
+    json.dumps({'ts': 1, 'bssid': mr53_bssid, 'rssi': -40}) + '\n',
+    json.dumps({'ts': 2, 'bssid': '00:00:00:00:00:01'}) + '\n',
+    '{not json\n',
+    json.dumps({'ts': 3, 'rssi': -60}) + '\n',
+    json.dumps([mr53_bssid]) + '\n',
+    '\n',
+    json.dumps({'ts': 4, 'bssid': 7}) + '\n',
+    json.dumps({'ts': 5, 'bssid': mr18_bssid.upper()})
+]
+
+
+def join(lines,input_format='csv',**kwargs):
+    outfile = io.StringIO()
+    unknownfile = io.StringIO()
+    summary = meraki_bssid_scans.join_scans(io.StringIO(''.join(lines)),outfile,inventory,unknownfile,input_format,**kwargs)
+    return (summary,outfile.getvalue(),unknownfile.getvalue())
+
+
+def read_csv(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+class JoinScansTests(unittest.TestCase):
+    def test_csv(self):
+        summary,matched,unknown = join(csv_lines)
+        self.assertEqual(read_csv(matched),[
+            ['Timestamp','BSSID','RSSI'] + meraki_bssid_scans.match_fields,
+            ['1',mr53_bssid,'-40'] + mr53_match,
+            ['3',mr18_bssid.upper().replace(':','-'),'-55'] + mr18_match,
+            ['6',' ' + mr53_bssid.upper() + ' ','-42'] + mr53_match
+        ])
+        # unknown rows, and the header, are written as they came in
+        self.assertEqual(read_csv(unknown),[['Timestamp','BSSID','RSSI'],['2','00:00:00:00:00:01','-80'],['5','junk','-70']])
+        self.assertEqual(summary,{'rows': 5, 'matched': 3, 'unknown': 2, 'invalid': 1})
+
+    def test_csv_bssid_column_anywhere(self):
+        summary,matched,unknown = join(['rssi, Bssid \n','-40,' + mr53_bssid + '\n'])
+        self.assertEqual(read_csv(matched),[['rssi',' Bssid '] + meraki_bssid_scans.match_fields,['-40',mr53_bssid] + mr53_match])
+
+    def test_csv_needs_a_bssid_column(self):
+        for header in ('timestamp,mac,rssi\n',''):
+            with self.assertRaises(ValueError):
+                join([header,'1,' + mr53_bssid + ',-40\n'])
+
+    def test_jsonl(self):
+        summary,matched,unknown = join(jsonl_lines,'jsonl')
+        rows = [json.loads(line) for line in matched.splitlines()]
+        self.assertEqual(rows,[
+            {'ts': 1, 'bssid': mr53_bssid, 'rssi': -40, 'ap_mac': '0c:8d:db:00:00:01', 'model': 'MR53', 'ssid_number': 3, 'band': '5', 'network_id': 'N_1'},
+            {'ts': 5, 'bssid': mr18_bssid.upper(), 'ap_mac': '00:18:0a:00:00:03', 'model': 'MR18', 'ssid_number': 15, 'band': '2.4', 'network_id': 'N_2'}
+        ])
+        # unknown lines are copied as is
+        self.assertEqual(unknown,jsonl_lines[1] + jsonl_lines[6])
+        self.assertEqual(summary,{'rows': 4, 'matched': 2, 'unknown': 2, 'invalid': 3})
+
+    def test_workers_give_the_same_output(self):
+        for input_format,lines in (('csv',csv_lines[:1] + csv_lines[1:] * 30),('jsonl',(jsonl_lines[:-1] + [jsonl_lines[-1] + '\n']) * 30)):
+            serial = join(lines,input_format,chunk_size=7)
+            self.assertEqual(serial[0]['rows'],(5 if input_format == 'csv' else 4) * 30)
+            self.assertEqual(join(lines,input_format,workers=3,chunk_size=7),serial)
+            self.assertEqual(join(lines,input_format,workers=3),serial)
+
+    def test_main(self):
+        directory = tempfile.mkdtemp()
+        try:
+            scans_filename = os.path.join(directory,'scans.jsonl')
+            inventory_filename = os.path.join(fixtures,'inventory.json')
+            with open(scans_filename,'w') as scansfile:
+                scansfile.write(''.join(jsonl_lines))
+            output_filename = os.path.join(directory,'enriched.jsonl')
+            unknown_filename = os.path.join(directory,'unknown.jsonl')
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                status = meraki_bssid_scans.main([scans_filename,'--inventory',inventory_filename,'-o',output_filename,'--unknown',unknown_filename,'--workers','2'])
+            self.assertEqual(status,0)
+            self.assertEqual(json.loads(stderr.getvalue()),{'rows': 4, 'matched': 2, 'unknown': 2, 'invalid': 3})
+            with open(output_filename) as outfile:
+                self.assertEqual(outfile.read(),join(jsonl_lines,'jsonl')[1])
+            with open(unknown_filename) as unknownfile:
+                self.assertEqual(unknownfile.read(),jsonl_lines[1] + jsonl_lines[6])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
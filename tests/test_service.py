@@ -0,0 +1,156 @@
+# Tests for the bssid lookup service, run on a local port against fixture data.
+#
+#   python -m pytest tests
+
+import csv
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+
+from meraki_bssid_calculator import MerakiBssidCalculator
+import meraki_bssid_service
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)),'fixtures')
+
+
+class ServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.inventory_filename = os.path.join(self.directory,'inventory.json')
+        shutil.copy(os.path.join(fixtures,'inventory.json'),self.inventory_filename)
+        self.server = None
+
+    def tearDown(self):
+        if (self.server is not None):
+            self.server.shutdown()
+            self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def serve(self,loader,source):
+        self.service = meraki_bssid_service.BssidLookupService(loader,source)
+        self.server = meraki_bssid_service.make_server(self.service,port=0)
+        threading.Thread(target=self.server.serve_forever,daemon=True).start()
+
+    def request(self,method,path,body=None):
+        connection = http.client.HTTPConnection('127.0.0.1',self.server.server_address[1],timeout=10)
+        try:
+            if isinstance(body,(dict,list,int)) or (body is None and method == 'POST'):
+                body = json.dumps(body)
+            connection.request(method,path,body)
+            response = connection.getresponse()
+            return (response.status,json.loads(response.read().decode('utf-8')))
+        finally:
+            connection.close()
+
+    def write_inventory(self,inventory):
+        with open(self.inventory_filename + '.tmp','w') as inventoryfile:
+            inventoryfile.write(inventory if isinstance(inventory,str) else json.dumps(inventory))
+        os.replace(self.inventory_filename + '.tmp',self.inventory_filename)
+
+
+class InventoryServiceTests(ServiceTestCase):
+    def setUp(self):
+        ServiceTestCase.setUp(self)
+        self.serve(meraki_bssid_service.load_inventory_index,self.inventory_filename)
+
+    def test_lookup(self):
+        bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3)['5']
+        status,payload = self.request('GET','/lookup?bssid=' + bssid.upper())
+        self.assertEqual(status,200)
+        self.assertEqual(payload['match'],{'ap_mac': '0c:8d:db:00:00:01', 'model': 'MR53', 'ssid_number': 3, 'band': '5', 'network_id': 'N_1'})
+
+    def test_lookup_unknown(self):
+        for bssid in ('00:00:00:00:00:01','junk',''):
+            status,payload = self.request('GET','/lookup?bssid=' + bssid)
+            self.assertEqual(status,200)
+            self.assertIsNone(payload['match'])
+
+    def test_lookup_many(self):
+        bssids = [
+            MerakiBssidCalculator.calculate('MR33','e0:55:3d:00:00:02',1)['2.4'],
+            '00:00:00:00:00:01',
+            MerakiBssidCalculator.calculate('MR18','00:18:0a:00:00:03',15)['5']
+        ]
+        status,payload = self.request('POST','/lookup',{'bssids': bssids})
+        self.assertEqual(status,200)
+        self.assertEqual([match and (match['ap_mac'],match['ssid_number'],match['band']) for match in payload['matches']],[
+            ('e0:55:3d:00:00:02',1,'2.4'),
+            None,
+            ('00:18:0a:00:00:03',15,'5')
+        ])
+
+    def test_lookup_many_rejects_bad_bodies(self):
+        for body in ('junk',{},{'bssids': 5},{'bssids': [None]},{'bssids': 'abc'},{'bssids': [['0c:8d:db:00:00:01']]},[1]):
+            status,payload = self.request('POST','/lookup',body)
+            self.assertEqual(status,400,body)
+            self.assertIn('error',payload)
+        # the server is still answering
+        self.assertEqual(self.request('GET','/health')[0],200)
+
+    def test_health_and_not_found(self):
+        status,payload = self.request('GET','/health')
+        self.assertEqual(status,200)
+        self.assertEqual(payload['entries'],90)
+        self.assertEqual(self.request('GET','/nowhere')[0],404)
+        self.assertEqual(self.request('POST','/nowhere',{})[0],404)
+
+    def test_reload(self):
+        bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:05',7)['2.4']
+        self.assertIsNone(self.request('GET','/lookup?bssid=' + bssid)[1]['match'])
+        self.write_inventory([{'mac': '0c:8d:db:00:00:05', 'networkId': 'N_3', 'model': 'MR53'}])
+        status,payload = self.request('POST','/reload')
+        self.assertEqual(status,200)
+        self.assertEqual(payload['entries'],30)
+        self.assertEqual(self.request('GET','/lookup?bssid=' + bssid)[1]['match']['network_id'],'N_3')
+
+    def test_failed_reload_keeps_the_index(self):
+        self.write_inventory('[not json')
+        status,payload = self.request('POST','/reload')
+        self.assertEqual(status,500)
+        self.assertEqual(self.request('GET','/health')[1]['entries'],90)
+
+    def test_lookups_during_reloads(self):
+        bssid = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3)['5']
+        failures = []
+
+        def lookups():
+            for i in range(50):
+                status,payload = self.request('GET','/lookup?bssid=' + bssid)
+                if (status != 200) or (payload['match'] is None):
+                    failures.append((status,payload))
+
+        threads = [threading.Thread(target=lookups) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(20):
+            self.service.reload()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures,[])
+
+
+class CsvServiceTests(ServiceTestCase):
+    def test_lookup(self):
+        csv_filename = os.path.join(self.directory,'bssids.csv')
+        bssids = MerakiBssidCalculator.calculate('MR53','0c:8d:db:00:00:01',3)
+        with open(csv_filename,'w',newline='') as csvfile:
+            writer = csv.writer(csvfile,lineterminator='\n')
+            writer.writerow(['Network name','SSID name','AP mac','2.4 BSSID','5 BSSID'])
+            writer.writerow(['Branch','Corp','0c:8d:db:00:00:01',bssids['2.4'],bssids['5']])
+        self.serve(meraki_bssid_service.load_csv_index,csv_filename)
+        status,payload = self.request('GET','/lookup?bssid=' + bssids['2.4'])
+        self.assertEqual(status,200)
+        self.assertEqual(payload['match'],{'network': 'Branch', 'ssid': 'Corp', 'ap_mac': '0c:8d:db:00:00:01', 'band': '2.4'})
+        status,payload = self.request('POST','/lookup',{'bssids': [bssids['5'],'00:00:00:00:00:01']})
+        self.assertEqual([match and match['band'] for match in payload['matches']],['5',None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# Tests for BssidDatabaseWriter, the sqlite export behind export_org_bssids_to_sqlite.
+#
+#   python -m pytest tests
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+sys.path.insert(0,os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+from meraki_bssid_sqlite import BssidDatabaseWriter
+import meraki_bssid_sqlite
+
+
+def write_rows(database_writer,network_id,aps,ssid_numbers=range(3)):
+    for ap in range(aps):
+        for ssid_number in ssid_numbers:
+            for band in ('2.4','5'):
+                database_writer.add(network_id,'Network ' + network_id,ssid_number,'SSID ' + str(ssid_number),'0c:8d:db:00:00:%02x' % ap,band,ap * 256 + ssid_number)
+
+
+class BssidDatabaseWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory,'bssids.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def query(self,sql,parameters=()):
+        connection = sqlite3.connect(self.filename)
+        try:
+            return connection.execute(sql,parameters).fetchall()
+        finally:
+            connection.close()
+
+    def org_rows(self,org_id):
+        return self.query('SELECT COUNT(*) FROM bssids WHERE org_id = ?',(org_id,))[0][0]
+
+    def index_names(self):
+        return sorted(name for name, in self.query("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'bssids_%'"))
+
+    def test_export(self):
+        database_writer = BssidDatabaseWriter(self.filename,'1',batch_size=7)
+        write_rows(database_writer,'N_1',4)
+        self.assertEqual(database_writer.close(),24)
+        self.assertEqual(self.org_rows('1'),24)
+        self.assertEqual(self.index_names(),['bssids_ap_mac','bssids_bssid'])
+        self.assertEqual(self.query("SELECT ap_mac FROM bssids WHERE bssid = '00:00:00:00:03:02' AND band = '5'"),[('0c:8d:db:00:00:03',)])
+
+    def test_concurrent_writers(self):
+        # the second writer must be able to write while the first is still collecting rows
+        first = BssidDatabaseWriter(self.filename,'1',batch_size=5)
+        second = BssidDatabaseWriter(self.filename,'2',batch_size=5)
+        write_rows(first,'N_1',3)
+        write_rows(second,'N_2',2)
+        self.assertEqual(second.close(),12)
+        write_rows(first,'N_3',1)
+        self.assertEqual(self.org_rows('1'),0)
+        self.assertEqual(first.close(),24)
+        self.assertEqual((self.org_rows('1'),self.org_rows('2')),(24,12))
+
+    def test_staging_does_not_block_other_writers(self):
+        first = BssidDatabaseWriter(self.filename,'1',batch_size=5)
+        second = BssidDatabaseWriter(self.filename,'2',batch_size=5)
+        write_rows(first,'N_1',3)
+        # each batch is committed as it's staged
+        self.assertFalse(first.connection.in_transaction)
+        # and a batch being staged holds no lock on the database
+        first.connection.execute('BEGIN')
+        first.connection.execute(meraki_bssid_sqlite.stage,('N_1','Network N_1',0,'SSID 0','0c:8d:db:00:00:09','5','00:00:00:00:00:09'))
+        write_rows(second,'N_2',2)
+        self.assertEqual(second.close(),12)
+        first.connection.execute('COMMIT')
+        first.close()
+        self.assertEqual((self.org_rows('1'),self.org_rows('2')),(19,12))
+
+    def test_reexport_deletes_stale_rows(self):
+        for org_id in ('1','2'):
+            database_writer = BssidDatabaseWriter(self.filename,org_id)
+            write_rows(database_writer,'N_' + org_id,4)
+            database_writer.close()
+        database_writer = BssidDatabaseWriter(self.filename,'1')
+        write_rows(database_writer,'N_1',2,ssid_numbers=[0])
+        database_writer.close()
+        self.assertEqual(self.org_rows('1'),4)
+        self.assertEqual(self.org_rows('2'),24)
+        self.assertEqual(self.query("SELECT DISTINCT generation FROM bssids WHERE org_id = '1'"),[(2,)])
+        self.assertEqual(self.index_names(),['bssids_ap_mac','bssids_bssid'])
+
+    def test_keeps_indexes_for_small_loads(self):
+        database_writer = BssidDatabaseWriter(self.filename,'1')
+        write_rows(database_writer,'N_1',10)
+        database_writer.close()
+        root_pages = self.query("SELECT name,rootpage FROM sqlite_master WHERE type = 'index' AND name LIKE 'bssids_%' ORDER BY name")
+        database_writer = BssidDatabaseWriter(self.filename,'2')
+        write_rows(database_writer,'N_2',1)
+        database_writer.close()
+        # rebuilt indexes would have been given new pages
+        self.assertEqual(self.query("SELECT name,rootpage FROM sqlite_master WHERE type = 'index' AND name LIKE 'bssids_%' ORDER BY name"),root_pages)
+        self.assertEqual(self.query("SELECT org_id FROM bssids INDEXED BY bssids_ap_mac WHERE ap_mac = '0c:8d:db:00:00:00' AND org_id = '2'"),[('2',)] * 6)
+
+    def test_abort_keeps_the_previous_export(self):
+        database_writer = BssidDatabaseWriter(self.filename,'1')
+        write_rows(database_writer,'N_1',4)
+        database_writer.close()
+        database_writer = BssidDatabaseWriter(self.filename,'1',batch_size=5)
+        write_rows(database_writer,'N_1',1)
+        database_writer.abort()
+        self.assertEqual(self.org_rows('1'),24)
+        self.assertEqual(self.query("SELECT DISTINCT generation FROM bssids"),[(1,)])
+
+    def test_failed_close_rolls_back(self):
+        database_writer = BssidDatabaseWriter(self.filename,'1')
+        write_rows(database_writer,'N_1',4)
+        database_writer.close()
+        database_writer = BssidDatabaseWriter(self.filename,'1')
+        write_rows(database_writer,'N_1',1)
+        database_writer.batch.append(('N_1',None,0,'SSID 0','0c:8d:db:00:00:09','5','00:00:00:00:00:01'))
+        with self.assertRaises(sqlite3.IntegrityError):
+            database_writer.close()
+        self.assertEqual(self.org_rows('1'),24)
+        self.assertEqual(self.query("SELECT DISTINCT generation FROM bssids"),[(1,)])
+
+
+@unittest.skipIf(requests is None,'requests is not installed')
+class ExportOrgBssidsTests(unittest.TestCase):
+    def setUp(self):
+        from dashboard_stub import DashboardStub, FakeOrg
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory,'bssids.sqlite')
+        self.stub = DashboardStub(FakeOrg(networks=6,aps_per_network=2)).start()
+
+    def tearDown(self):
+        self.stub.stop()
+        shutil.rmtree(self.directory)
+
+    def test_export_matches_iter_org_bssids(self):
+        from meraki_bssid_getter import MerakiBssidGetter
+        bssid_getter = MerakiBssidGetter('key',base_url=self.stub.base_url,rate_limit=1000)
+        rows = list(bssid_getter.iter_org_bssids('1'))
+        self.assertEqual(bssid_getter.export_org_bssids_to_sqlite('1',self.filename),len(rows) * 2)
+        connection = sqlite3.connect(self.filename)
+        try:
+            exported = set(connection.execute("SELECT ap_mac,ssid_number,band,bssid FROM bssids WHERE org_id = '1'"))
+        finally:
+            connection.close()
+        self.assertEqual(len(exported),len(rows) * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()